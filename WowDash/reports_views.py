@@ -4,18 +4,60 @@ Financial/order reports per branch/center with date filtering
 """
 
 from django.shortcuts import render
-from django.db import models
-from django.db.models import Sum, Count, Avg, Q
-from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.db import connection, models
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Case,
+    CharField,
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, NullIf, TruncDate, TruncMonth, TruncWeek
 from django.utils import timezone
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from datetime import timedelta
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+from operator import itemgetter
+import hashlib
+import heapq
+import statistics
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import condition
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from orders.models import Order
 from services.models import Product
+from services.analytics import (
+    get_remaining_balance_summary,
+    get_remaining_by_branch,
+    get_remaining_by_center,
+    get_remaining_by_client_type,
+    get_reports_cache_version,
+    get_top_debtors,
+)
 from accounts.models import BotUser
 from organizations.models import Branch, TranslationCenter, AdminUser
 from organizations.rbac import (
@@ -38,11 +80,130 @@ PERIOD_CHOICES = [
     ("custom", "Custom Range"),
 ]
 
+# Date range and chart grouping for a report period, see get_period_dates()
+PeriodInfo = namedtuple(
+    "PeriodInfo",
+    "date_from date_to date_from_str date_to_str label trunc_func date_format period",
+)
+
+# Order status -> display label (lazy translations, resolved when rendered)
+_STATUS_CHOICE_MAP = dict(Order.STATUS_CHOICES)
+
+# Copy-aware expense cost of one order for one of its product's expenses:
+# price_for_original + price_for_copy * copy_number
+_ORDER_EXPENSE_COST = ExpressionWrapper(
+    F("product__expenses__price_for_original")
+    + F("product__expenses__price_for_copy") * F("copy_number"),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
+
+# The same cost seen from the expense side (expense -> products -> orders)
+_EXPENSE_ORDER_COST = ExpressionWrapper(
+    F("price_for_original") + F("price_for_copy") * F("products__order__copy_number"),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
+
+
+class _Median(Aggregate):
+    """Continuous median via PERCENTILE_CONT (PostgreSQL only)."""
+
+    function = "PERCENTILE_CONT"
+    name = "Median"
+    template = "%(function)s(0.5) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+
+class _KnownCountPaginator(Paginator):
+    """Paginator for a queryset whose row count was already computed by the view."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @property
+    def count(self):
+        return self._known_count
+
+
+# Serialized form of an empty chart series
+_EMPTY_JSON_LIST = "[]"
+
+
+def _chart_json(value):
+    """Serialize chart data for the templates, using orjson when installed."""
+    if isinstance(value, list) and not value:
+        return _EMPTY_JSON_LIST
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+# Report contexts are cached for this long (seconds); order and expense changes
+# invalidate them earlier through the reports cache version
+REPORT_CACHE_TIMEOUT = 120
+# "Today" runs up to the current time, so it is kept fresher
+REPORT_TODAY_CACHE_TIMEOUT = 30
+
+
+def _cached_report_context(request, name, build_context, timeout=REPORT_CACHE_TIMEOUT):
+    """
+    Return build_context(request), cached per report, user and query string
+    until the reports cache version changes.
+    """
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.GET.items()))
+    cache_key = f"report:{name}:{get_reports_cache_version()}:{request.user.id}:{params}"
+    context = cache.get(cache_key)
+    if context is None:
+        context = build_context(request)
+        if request.GET.get("period") == "today":
+            timeout = min(timeout, REPORT_TODAY_CACHE_TIMEOUT)
+        cache.set(cache_key, context, timeout)
+    return context
+
+
+@lru_cache(maxsize=256)
+def _custom_period_range(custom_from, custom_to, tz_name):
+    """
+    Parse a custom date range into (date_from, date_to, label, trunc_function, date_format).
+    Memoized: the result depends only on the arguments, including the active timezone.
+    """
+    from datetime import datetime
+
+    date_from = datetime.strptime(custom_from, "%Y-%m-%d")
+    date_to = datetime.strptime(custom_to, "%Y-%m-%d").replace(
+        hour=23, minute=59, second=59
+    )
+    # Make timezone aware
+    date_from = (
+        timezone.make_aware(date_from)
+        if timezone.is_naive(date_from)
+        else date_from
+    )
+    date_to = (
+        timezone.make_aware(date_to) if timezone.is_naive(date_to) else date_to
+    )
+    days_diff = (date_to - date_from).days
+    label = f"{custom_from} to {custom_to}"
+    # Choose appropriate truncation based on range
+    if days_diff <= 1:
+        trunc_func = TruncDate
+        date_format = "%H:%M"
+    elif days_diff <= 31:
+        trunc_func = TruncDate
+        date_format = "%b %d"
+    elif days_diff <= 90:
+        trunc_func = TruncWeek
+        date_format = "Week %W"
+    else:
+        trunc_func = TruncMonth
+        date_format = "%b %Y"
+    return date_from, date_to, label, trunc_func, date_format
+
 
 def get_period_dates(period, custom_from=None, custom_to=None):
     """
     Calculate date range based on selected period.
-    Returns (date_from, date_to, period_label, trunc_function)
+    Returns a PeriodInfo (date range, its string forms, label, trunc function and date format)
     """
     today = timezone.now()
 
@@ -94,36 +255,9 @@ def get_period_dates(period, custom_from=None, custom_to=None):
         trunc_func = TruncMonth
         date_format = "%b"
     elif period == "custom" and custom_from and custom_to:
-        from datetime import datetime
-
-        date_from = datetime.strptime(custom_from, "%Y-%m-%d")
-        date_to = datetime.strptime(custom_to, "%Y-%m-%d").replace(
-            hour=23, minute=59, second=59
-        )
-        # Make timezone aware
-        date_from = (
-            timezone.make_aware(date_from)
-            if timezone.is_naive(date_from)
-            else date_from
-        )
-        date_to = (
-            timezone.make_aware(date_to) if timezone.is_naive(date_to) else date_to
+        date_from, date_to, label, trunc_func, date_format = _custom_period_range(
+            custom_from, custom_to, timezone.get_current_timezone_name()
         )
-        days_diff = (date_to - date_from).days
-        label = f"{custom_from} to {custom_to}"
-        # Choose appropriate truncation based on range
-        if days_diff <= 1:
-            trunc_func = TruncDate
-            date_format = "%H:%M"
-        elif days_diff <= 31:
-            trunc_func = TruncDate
-            date_format = "%b %d"
-        elif days_diff <= 90:
-            trunc_func = TruncWeek
-            date_format = "Week %W"
-        else:
-            trunc_func = TruncMonth
-            date_format = "%b %Y"
     else:
         # Default to last 30 days
         date_from = today - timedelta(days=30)
@@ -133,30 +267,28 @@ def get_period_dates(period, custom_from=None, custom_to=None):
         date_format = "%b %d"
         period = "month"
 
-    return {
-        "date_from": date_from,
-        "date_to": date_to,
-        "date_from_str": (
-            date_from.strftime("%Y-%m-%d")
-            if hasattr(date_from, "strftime")
-            else str(date_from)[:10]
-        ),
-        "date_to_str": (
-            date_to.strftime("%Y-%m-%d")
-            if hasattr(date_to, "strftime")
-            else str(date_to)[:10]
-        ),
-        "label": label,
-        "trunc_func": trunc_func,
-        "date_format": date_format,
-        "period": period,
-    }
+    return PeriodInfo(
+        date_from=date_from,
+        date_to=date_to,
+        date_from_str=date_from.strftime("%Y-%m-%d"),
+        date_to_str=date_to.strftime("%Y-%m-%d"),
+        label=label,
+        trunc_func=trunc_func,
+        date_format=date_format,
+        period=period,
+    )
 
 
 @login_required(login_url="admin_login")
 @permission_required('can_view_financial_reports')
 def financial_reports(request):
     """Financial reports view with revenue analytics - requires can_view_financial_reports permission"""
+    context = _cached_report_context(request, "financial", _financial_reports_context)
+    return render(request, "reports/financial.html", context)
+
+
+def _financial_reports_context(request):
+    """Build the financial report context (revenue metrics and breakdowns)"""
     # Period filter
     period = request.GET.get("period", "month")
     custom_from = request.GET.get("date_from")
@@ -166,10 +298,10 @@ def financial_reports(request):
 
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
-    trunc_func = period_data["trunc_func"]
-    date_format = period_data["date_format"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
+    trunc_func = period_data.trunc_func
+    date_format = period_data.date_format
 
     # Get orders based on user role
     all_orders = get_user_orders(request.user)
@@ -191,16 +323,17 @@ def financial_reports(request):
     if branch_id:
         orders = orders.filter(branch_id=branch_id)
 
-    # Calculate financial metrics
-    total_revenue = float(orders.aggregate(total=Sum("total_price"))["total"] or 0)
-    total_orders = orders.count()
-    avg_order_value = float(orders.aggregate(avg=Avg("total_price"))["avg"] or 0)
-
-    # Completed orders revenue
-    completed_orders = orders.filter(status="completed")
-    completed_revenue = float(
-        completed_orders.aggregate(total=Sum("total_price"))["total"] or 0
+    # Calculate financial metrics, including completed orders revenue, in one query
+    metrics = orders.aggregate(
+        total=Sum("total_price"),
+        count=Count("id"),
+        avg=Avg("total_price"),
+        completed=Sum("total_price", filter=Q(status="completed")),
     )
+    total_revenue = float(metrics["total"] or 0)
+    total_orders = metrics["count"]
+    avg_order_value = float(metrics["avg"] or 0)
+    completed_revenue = float(metrics["completed"] or 0)
 
     # Revenue breakdown by period
     revenue_by_period = (
@@ -210,14 +343,10 @@ def financial_reports(request):
         .order_by("period")
     )
 
-    daily_labels = []
-    daily_values = []
-    daily_counts = []
-    for item in revenue_by_period:
-        if item["period"]:
-            daily_labels.append(item["period"].strftime(date_format))
-            daily_values.append(float(item["revenue"] or 0))
-            daily_counts.append(item["count"])
+    period_rows = [item for item in revenue_by_period if item["period"]]
+    daily_labels = [item["period"].strftime(date_format) for item in period_rows]
+    daily_values = [float(item["revenue"] or 0) for item in period_rows]
+    daily_counts = [item["count"] for item in period_rows]
 
     # Revenue by status
     status_breakdown = (
@@ -231,7 +360,7 @@ def financial_reports(request):
         status_data.append(
             {
                 "status": item["status"],
-                "status_display": dict(Order.STATUS_CHOICES).get(
+                "status_display": _STATUS_CHOICE_MAP.get(
                     item["status"], item["status"]
                 ),
                 "revenue": float(item["revenue"] or 0),
@@ -241,9 +370,8 @@ def financial_reports(request):
 
     # Revenue by branch (if owner/superuser)
     branch_revenue = []
-    is_owner = False
-    if hasattr(request.user, "admin_profile") and request.user.admin_profile:
-        is_owner = request.user.admin_profile.is_owner
+    admin_profile = getattr(request.user, "admin_profile", None)
+    is_owner = bool(admin_profile and admin_profile.is_owner)
 
     if is_owner or request.user.is_superuser:
         branch_data = (
@@ -303,24 +431,24 @@ def financial_reports(request):
         "avg_order_value": avg_order_value,
         "completed_revenue": completed_revenue,
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Chart data
-        "daily_labels": json.dumps(daily_labels),
-        "daily_values": json.dumps(daily_values),
-        "daily_counts": json.dumps(daily_counts),
-        "branch_labels": json.dumps(branch_labels),
-        "branch_revenue_values": json.dumps(branch_revenue_values),
-        "branch_order_counts": json.dumps(branch_order_counts),
+        "daily_labels": _chart_json(daily_labels),
+        "daily_values": _chart_json(daily_values),
+        "daily_counts": _chart_json(daily_counts),
+        "branch_labels": _chart_json(branch_labels),
+        "branch_revenue_values": _chart_json(branch_revenue_values),
+        "branch_order_counts": _chart_json(branch_order_counts),
         # Breakdowns
         "status_data": status_data,
         "branch_revenue": branch_revenue,
         "product_data": product_data,
     }
-    return render(request, "reports/financial.html", context)
+    return context
 
 
 @login_required(login_url="admin_login")
@@ -337,10 +465,10 @@ def order_reports(request):
 
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
-    trunc_func = period_data["trunc_func"]
-    date_format = period_data["date_format"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
+    trunc_func = period_data.trunc_func
+    date_format = period_data.date_format
 
     # Get orders based on user role
     all_orders = get_user_orders(request.user)
@@ -348,7 +476,8 @@ def order_reports(request):
     # Apply filters
     orders = all_orders.filter(created_at__gte=date_from, created_at__lte=date_to)
 
-    branches = get_user_branches(request.user)
+    # Center is joined for the "center - branch" filter labels
+    branches = get_user_branches(request.user).select_related("center")
 
     # Center filter for superuser
     centers = None
@@ -364,11 +493,18 @@ def order_reports(request):
         orders = orders.filter(status=status_filter)
 
     # Order metrics
-    total_orders = orders.count()
-    completed = orders.filter(status="completed").count()
-    cancelled = orders.filter(status="cancelled").count()
-    in_progress = orders.filter(status="in_progress").count()
-    pending = orders.filter(status__in=["pending", "ready"]).count()
+    status_counts = orders.aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+        cancelled=Count("id", filter=Q(status="cancelled")),
+        in_progress=Count("id", filter=Q(status="in_progress")),
+        pending=Count("id", filter=Q(status__in=["pending", "ready"])),
+    )
+    total_orders = status_counts["total"]
+    completed = status_counts["completed"]
+    cancelled = status_counts["cancelled"]
+    in_progress = status_counts["in_progress"]
+    pending = status_counts["pending"]
 
     completion_rate = round(
         (completed / total_orders * 100) if total_orders > 0 else 0, 1
@@ -385,24 +521,27 @@ def order_reports(request):
         .order_by("period")
     )
 
-    daily_labels = []
-    daily_values = []
-    for item in orders_by_period:
-        if item["period"]:
-            daily_labels.append(item["period"].strftime(date_format))
-            daily_values.append(item["count"])
+    period_rows = [item for item in orders_by_period if item["period"]]
+    daily_labels = [item["period"].strftime(date_format) for item in period_rows]
+    daily_values = [item["count"] for item in period_rows]
 
-    # Orders by status breakdown for pie chart
+    # Orders by status breakdown for pie chart, with the translated status
+    # label resolved by the database
+    status_label = Case(
+        *[When(status=value, then=Value(str(label))) for value, label in Order.STATUS_CHOICES],
+        default=F("status"),
+        output_field=CharField(),
+    )
     status_breakdown = (
-        orders.values("status").annotate(count=Count("id")).order_by("-count")
+        orders.values("status")
+        .annotate(count=Count("id"), label=status_label)
+        .order_by("-count", "status")
     )
 
     status_labels = []
     status_values = []
     for item in status_breakdown:
-        # Convert __proxy__ to string for JSON serialization
-        label = dict(Order.STATUS_CHOICES).get(item["status"], item["status"])
-        status_labels.append(str(label))
+        status_labels.append(item["label"])
         status_values.append(item["count"])
 
     # Orders by language pair
@@ -424,18 +563,19 @@ def order_reports(request):
     ).order_by("-created_at")
 
     page = request.GET.get("page", 1)
-    paginator = Paginator(recent_orders_qs, 10)  # 10 orders per page
+    # The order total from the metrics aggregate spares the paginator a COUNT(*)
+    paginator = _KnownCountPaginator(recent_orders_qs, 10, total_orders)  # 10 orders per page
     recent_orders = paginator.get_page(page)
 
     context = {
         "title": "Order Reports",
         "subTitle": "Reports / Orders",
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Filters
         "branches": branches,
         "selected_branch": branch_id,
@@ -452,10 +592,10 @@ def order_reports(request):
         "completion_rate": completion_rate,
         "cancellation_rate": cancellation_rate,
         # Chart data
-        "daily_labels": json.dumps(daily_labels),
-        "daily_values": json.dumps(daily_values),
-        "status_labels": json.dumps(status_labels),
-        "status_values": json.dumps(status_values),
+        "daily_labels": _chart_json(daily_labels),
+        "daily_values": _chart_json(daily_values),
+        "status_labels": _chart_json(status_labels),
+        "status_values": _chart_json(status_values),
         # Breakdowns
         "language_data": language_data,
         "recent_orders": recent_orders,
@@ -464,6 +604,33 @@ def order_reports(request):
     return render(request, "reports/orders.html", context)
 
 
+def _staff_performance_row(staff):
+    """Build a staff performance table row from an annotated AdminUser."""
+    total_assigned = staff.total_assigned
+    completed_orders = staff.completed
+
+    # Calculate average completion time (simplified - based on updated_at - created_at)
+    completion_rate = round(
+        (completed_orders / total_assigned * 100) if total_assigned > 0 else 0, 1
+    )
+
+    return {
+        "id": staff.id,
+        "name": staff.user.get_full_name() or staff.user.username,
+        "center": (
+            staff.branch.center.name
+            if staff.branch and staff.branch.center
+            else "N/A"
+        ),
+        "branch": staff.branch.name if staff.branch else "N/A",
+        "role": staff.role.name if staff.role else "Staff",
+        "total_assigned": total_assigned,
+        "completed": completed_orders,
+        "revenue": float(staff.revenue or 0),
+        "completion_rate": completion_rate,
+    }
+
+
 @login_required(login_url="admin_login")
 @any_permission_required('can_view_reports', 'can_view_analytics')
 def staff_performance(request):
@@ -477,12 +644,13 @@ def staff_performance(request):
 
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
 
     # Get orders and branches based on user role
     all_orders = get_user_orders(request.user)
-    branches = get_user_branches(request.user)
+    # Center is joined for the "center - branch" filter labels
+    branches = get_user_branches(request.user).select_related("center")
 
     # Determine user's access level
     centers = None
@@ -532,7 +700,7 @@ def staff_performance(request):
 
     # Get staff members based on user's access level
     if request.user.is_superuser:
-        staff_members = AdminUser.objects.filter(is_active=True).select_related('user', 'role', 'branch', 'branch__center', 'center')
+        staff_members = AdminUser.objects.filter(is_active=True).select_related('user', 'role', 'branch', 'branch__center')
         if center_id:
             # Filter by center - staff can be in center OR have branches in that center
             staff_members = staff_members.filter(
@@ -546,7 +714,7 @@ def staff_performance(request):
             staff_members = AdminUser.objects.filter(
                 models.Q(center=user_center) | models.Q(branch__center=user_center),
                 is_active=True
-            ).select_related('user', 'role', 'branch', 'branch__center', 'center').distinct()
+            ).select_related('user', 'role', 'branch', 'branch__center').distinct()
         elif is_branch_level and user_branch:
             # Branch-level user: show only staff in their branch
             staff_members = AdminUser.objects.filter(
@@ -563,47 +731,30 @@ def staff_performance(request):
     if branch_id and is_center_level:
         staff_members = staff_members.filter(branch_id=branch_id)
 
-    # Calculate performance for each staff member
-    staff_data = []
-    for staff in staff_members:
-        staff_orders = orders.filter(assigned_to=staff)
-        total_assigned = staff_orders.count()
-        completed_orders = staff_orders.filter(status="completed").count()
-        revenue = float(
-            staff_orders.filter(status="completed").aggregate(total=Sum("total_price"))[
-                "total"
-            ]
-            or 0
-        )
-
-        # Calculate average completion time (simplified - based on updated_at - created_at)
-        completion_rate = round(
-            (completed_orders / total_assigned * 100) if total_assigned > 0 else 0, 1
-        )
-
-        staff_data.append(
-            {
-                "id": staff.id,
-                "name": staff.user.get_full_name() or staff.user.username,
-                "center": (
-                    staff.branch.center.name
-                    if staff.branch and staff.branch.center
-                    else "N/A"
-                ),
-                "branch": staff.branch.name if staff.branch else "N/A",
-                "role": staff.role.name if staff.role else "Staff",
-                "total_assigned": total_assigned,
-                "completed": completed_orders,
-                "revenue": revenue,
-                "completion_rate": completion_rate,
-            }
-        )
+    # Only the columns rendered in the staff table
+    staff_members = staff_members.only(
+        "id",
+        "user__first_name",
+        "user__last_name",
+        "user__username",
+        "branch__name",
+        "branch__center__name",
+        "role__name",
+    )
 
-    # Sort by completed orders
-    staff_data.sort(key=lambda x: x["completed"], reverse=True)
+    # Assigned/completed counts and completed revenue annotated per staff member,
+    # ordered in the database so only the top performers and the current page
+    # are materialized
+    in_period = Q(assigned_orders__in=orders)
+    completed_in_period = in_period & Q(assigned_orders__status="completed")
+    ranked_staff = staff_members.annotate(
+        total_assigned=Count("assigned_orders", filter=in_period),
+        completed=Count("assigned_orders", filter=completed_in_period),
+        revenue=Sum("assigned_orders__total_price", filter=completed_in_period),
+    ).order_by("-completed", "user__first_name", "user__last_name", "id")
 
     # Top performers
-    top_performers = staff_data[:5] if staff_data else []
+    top_performers = [_staff_performance_row(staff) for staff in ranked_staff[:5]]
 
     # Staff performance chart data
     staff_labels = [s["name"] for s in top_performers]
@@ -612,18 +763,19 @@ def staff_performance(request):
 
     # Pagination for staff data
     page = request.GET.get("page", 1)
-    paginator = Paginator(staff_data, 10)  # 10 staff per page
+    paginator = Paginator(ranked_staff, 10)  # 10 staff per page
     staff_page = paginator.get_page(page)
+    staff_page.object_list = [_staff_performance_row(staff) for staff in staff_page]
 
     context = {
         "title": "Staff Performance",
         "subTitle": "Reports / Staff Performance",
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Filters
         "branches": branches,
         "selected_branch": branch_id,
@@ -639,9 +791,9 @@ def staff_performance(request):
         "staff_page": staff_page,
         "top_performers": top_performers,
         # Chart data
-        "staff_labels": json.dumps(staff_labels),
-        "staff_completed": json.dumps(staff_completed),
-        "staff_revenue": json.dumps(staff_revenue),
+        "staff_labels": _chart_json(staff_labels),
+        "staff_completed": _chart_json(staff_completed),
+        "staff_revenue": _chart_json(staff_revenue),
     }
     return render(request, "reports/staff_performance.html", context)
 
@@ -650,6 +802,12 @@ def staff_performance(request):
 @permission_required('can_view_analytics')
 def branch_comparison(request):
     """Compare branch performance - requires can_view_analytics permission"""
+    context = _cached_report_context(request, "branch_comparison", _branch_comparison_context)
+    return render(request, "reports/branch_comparison.html", context)
+
+
+def _branch_comparison_context(request):
+    """Build the branch comparison context (per-branch metrics and totals)"""
     # Period filter
     period = request.GET.get("period", "month")
     custom_from = request.GET.get("date_from")
@@ -658,8 +816,8 @@ def branch_comparison(request):
 
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
 
     # Get branches based on user role
     branches = get_user_branches(request.user)
@@ -675,20 +833,70 @@ def branch_comparison(request):
 
     orders = all_orders.filter(created_at__gte=date_from, created_at__lte=date_to)
 
-    # Calculate metrics for each branch
-    branch_data = []
-    for branch in branches:
-        branch_orders = orders.filter(branch=branch)
-        total_orders = branch_orders.count()
-        completed = branch_orders.filter(status="completed").count()
-        revenue = float(branch_orders.aggregate(total=Sum("total_price"))["total"] or 0)
-        avg_value = float(branch_orders.aggregate(avg=Avg("total_price"))["avg"] or 0)
+    # Order metrics, staff and customer counts grouped by branch
+    order_stats = {
+        row["branch_id"]: row
+        for row in orders.filter(branch__in=branches)
+        .values("branch_id")
+        .annotate(
+            total_orders=Count("id"),
+            completed=Count("id", filter=Q(status="completed")),
+            avg_value=Avg("total_price"),
+        )
+        .order_by()
+    }
+    staff_counts = dict(
+        AdminUser.objects.filter(branch__in=branches, is_active=True)
+        .values_list("branch_id")
+        .annotate(Count("id"))
+        .order_by()
+    )
+    customer_counts = dict(
+        BotUser.objects.filter(branch__in=branches, is_active=True)
+        .values_list("branch_id")
+        .annotate(Count("id"))
+        .order_by()
+    )
 
-        # Staff count
-        staff_count = AdminUser.objects.filter(branch=branch, is_active=True).count()
+    # Branches ranked by period revenue in the database
+    branch_revenue_subquery = (
+        orders.filter(branch=OuterRef("pk"))
+        .order_by()
+        .values("branch")
+        .annotate(total=Sum("total_price"))
+        .values("total")
+    )
+    ranked_branches = (
+        branches.select_related("center")
+        .only("id", "name", "center__name")
+        .annotate(
+            period_revenue=Coalesce(
+                Subquery(branch_revenue_subquery, output_field=DecimalField()),
+                Value(0, output_field=DecimalField()),
+            )
+        )
+        .order_by("-period_revenue", *Branch._meta.ordering)
+    )
 
-        # Customer count
-        customer_count = BotUser.objects.filter(branch=branch, is_active=True).count()
+    # Calculate metrics for each branch, accumulating the summary totals
+    branch_data = []
+    total_revenue = 0
+    total_orders_count = 0
+    total_staff = 0
+    total_customers = 0
+    for branch in ranked_branches.iterator(chunk_size=500):
+        stats = order_stats.get(branch.id, {})
+        total_orders = stats.get("total_orders", 0)
+        completed = stats.get("completed", 0)
+        revenue = float(branch.period_revenue)
+        avg_value = float(stats.get("avg_value") or 0)
+        staff_count = staff_counts.get(branch.id, 0)
+        customer_count = customer_counts.get(branch.id, 0)
+
+        total_revenue += revenue
+        total_orders_count += total_orders
+        total_staff += staff_count
+        total_customers += customer_count
 
         branch_data.append(
             {
@@ -707,45 +915,36 @@ def branch_comparison(request):
             }
         )
 
-    # Sort by revenue
-    branch_data.sort(key=lambda x: x["revenue"], reverse=True)
-
-    # Chart data
+    # Chart data (top 10 branches by revenue)
     branch_labels = [b["name"] for b in branch_data[:10]]
     branch_revenue = [b["revenue"] for b in branch_data[:10]]
     branch_orders_count = [b["total_orders"] for b in branch_data[:10]]
 
-    # Summary
-    total_revenue = sum(b["revenue"] for b in branch_data)
-    total_orders_count = sum(b["total_orders"] for b in branch_data)
-    total_staff = sum(b["staff_count"] for b in branch_data)
-    total_customers = sum(b["customer_count"] for b in branch_data)
-
     context = {
         "title": "Branch Comparison",
         "subTitle": "Reports / Branch Comparison",
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Filters
         "centers": centers,
         "selected_center": center_id,
         # Data
         "branch_data": branch_data,
         # Chart data
-        "branch_labels": json.dumps(branch_labels),
-        "branch_revenue": json.dumps(branch_revenue),
-        "branch_orders_count": json.dumps(branch_orders_count),
+        "branch_labels": _chart_json(branch_labels),
+        "branch_revenue": _chart_json(branch_revenue),
+        "branch_orders_count": _chart_json(branch_orders_count),
         # Summary
         "total_revenue": total_revenue,
         "total_orders_count": total_orders_count,
         "total_staff": total_staff,
         "total_customers": total_customers,
     }
-    return render(request, "reports/branch_comparison.html", context)
+    return context
 
 
 @login_required(login_url="admin_login")
@@ -761,10 +960,10 @@ def customer_analytics(request):
 
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
-    trunc_func = period_data["trunc_func"]
-    date_format = period_data["date_format"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
+    trunc_func = period_data.trunc_func
+    date_format = period_data.date_format
 
     # Get customers and orders based on user role
     customers = get_user_customers(request.user)
@@ -777,12 +976,11 @@ def customer_analytics(request):
         centers = TranslationCenter.objects.filter(is_active=True)
         if center_id:
             # Filter customers who have orders in branches of this center
-            customer_ids = (
-                orders.filter(branch__center_id=center_id)
-                .values_list("customer_id", flat=True)
-                .distinct()
+            customers = customers.filter(
+                Exists(
+                    orders.filter(bot_user=OuterRef("pk"), branch__center_id=center_id)
+                )
             )
-            customers = customers.filter(id__in=customer_ids)
             orders = orders.filter(branch__center_id=center_id)
             branches = branches.filter(center_id=center_id)
 
@@ -793,14 +991,17 @@ def customer_analytics(request):
     # Date range filter
     orders = orders.filter(created_at__gte=date_from, created_at__lte=date_to)
 
-    # Customer metrics
-    total_customers = customers.count()
-    active_customers = customers.filter(is_active=True).count()
-    new_customers = customers.filter(
-        created_at__gte=date_from, created_at__lte=date_to
-    ).count()
-
-    agencies = customers.filter(is_agency=True).count()
+    # Customer metrics in one query
+    customer_counts = customers.aggregate(
+        total=Count("id"),
+        active=Count("id", filter=Q(is_active=True)),
+        new=Count("id", filter=Q(created_at__gte=date_from, created_at__lte=date_to)),
+        agencies=Count("id", filter=Q(is_agency=True)),
+    )
+    total_customers = customer_counts["total"]
+    active_customers = customer_counts["active"]
+    new_customers = customer_counts["new"]
+    agencies = customer_counts["agencies"]
 
     # Customer acquisition trend
     acquisition_data = (
@@ -811,12 +1012,9 @@ def customer_analytics(request):
         .order_by("period")
     )
 
-    acquisition_labels = []
-    acquisition_values = []
-    for item in acquisition_data:
-        if item["period"]:
-            acquisition_labels.append(item["period"].strftime(date_format))
-            acquisition_values.append(item["count"])
+    period_rows = [item for item in acquisition_data if item["period"]]
+    acquisition_labels = [item["period"].strftime(date_format) for item in period_rows]
+    acquisition_values = [item["count"] for item in period_rows]
 
     # Top customers by orders
     top_customers = (
@@ -847,11 +1045,11 @@ def customer_analytics(request):
         "title": "Customer Analytics",
         "subTitle": "Reports / Customers",
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Filters
         "branches": branches,
         "selected_branch": branch_id,
@@ -863,8 +1061,8 @@ def customer_analytics(request):
         "new_customers": new_customers,
         "agencies": agencies,
         # Chart data
-        "acquisition_labels": json.dumps(acquisition_labels),
-        "acquisition_values": json.dumps(acquisition_values),
+        "acquisition_labels": _chart_json(acquisition_labels),
+        "acquisition_values": _chart_json(acquisition_values),
         # Breakdowns
         "top_customers": top_customer_data,
         "type_breakdown": type_breakdown,
@@ -872,6 +1070,23 @@ def customer_analytics(request):
     return render(request, "reports/customers.html", context)
 
 
+# Generated Excel exports are cached for this long (seconds)
+EXPORT_CACHE_TIMEOUT = 300
+
+# Exportable report types and the permissions (any one of) needed to export
+# each, matching the permissions of the report's own page
+EXPORT_REPORT_PERMISSIONS = {
+    'orders': ('can_view_reports', 'can_view_analytics'),
+    'financial': ('can_view_financial_reports',),
+    'staff_performance': ('can_view_reports', 'can_view_analytics'),
+    'branch_comparison': ('can_view_analytics',),
+    'customers': ('can_view_analytics', 'can_view_customer_details'),
+    'unit_economy': ('can_view_financial_reports',),
+    'my_statistics': (),
+    'expense_analytics': ('can_view_expenses', 'can_manage_expenses', 'can_view_financial_reports'),
+}
+
+
 @login_required(login_url="admin_login")
 @permission_required('can_export_data')
 def export_report(request, report_type):
@@ -893,6 +1108,15 @@ def export_report(request, report_type):
     from django.http import HttpResponse
     from django.contrib import messages
     
+    # Validate report type and the user's access to that report before any work
+    required_permissions = EXPORT_REPORT_PERMISSIONS.get(report_type)
+    if required_permissions is None:
+        return JsonResponse({'error': f'Invalid report type. Valid types: {", ".join(EXPORT_REPORT_PERMISSIONS)}'}, status=400)
+    if required_permissions and not request.user.is_superuser and not any(
+        request.admin_profile.has_permission(perm) for perm in required_permissions
+    ):
+        return JsonResponse({'error': "You don't have permission to export this report."}, status=403)
+    
     # Collect all filter parameters
     filters = {
         'period': request.GET.get('period', 'month'),
@@ -907,32 +1131,38 @@ def export_report(request, report_type):
         'expense_type': request.GET.get('expense_type'),
     }
     
-    # Validate report type
-    valid_types = [
-        'orders', 'financial', 'staff_performance', 
-        'branch_comparison', 'customers', 'unit_economy', 'my_statistics', 'expense_analytics'
-    ]
-    if report_type not in valid_types:
-        return JsonResponse({'error': f'Invalid report type. Valid types: {", ".join(valid_types)}'}, status=400)
-    
+    # Repeat exports with the same filters are served from the cache until the
+    # reports cache version changes
+    params = "&".join(f"{key}={value}" for key, value in sorted(filters.items()))
+    cache_key = "report_export:" + hashlib.md5(
+        f"{get_reports_cache_version()}:{request.user.id}:{report_type}:{params}".encode()
+    ).hexdigest()
+
     try:
-        # Create exporter and generate Excel
-        exporter = ReportExporter(request.user)
-        result = exporter.export(report_type, filters)
-        
-        if not result['success']:
-            # Return JSON error for AJAX or redirect with message
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        cached = cache.get(cache_key)
+        if cached is not None:
+            file_content, filename = cached
+        else:
+            # Create exporter and generate Excel
+            exporter = ReportExporter(request.user)
+            result = exporter.export(report_type, filters)
+            
+            if not result['success']:
+                # Return JSON error for AJAX or redirect with message
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({'error': result['message']}, status=400)
+                messages.warning(request, result['message'])
                 return JsonResponse({'error': result['message']}, status=400)
-            messages.warning(request, result['message'])
-            return JsonResponse({'error': result['message']}, status=400)
+            
+            file_content, filename = result['file_content'], result['filename']
+            cache.set(cache_key, (file_content, filename), EXPORT_CACHE_TIMEOUT)
         
         # Create HTTP response with Excel file
         response = HttpResponse(
-            result['file_content'],
+            file_content,
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        response['Content-Disposition'] = f'attachment; filename="{result["filename"]}"'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
         
     except Exception as e:
@@ -945,6 +1175,30 @@ def export_report(request, report_type):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+# Short status labels and chart colors for the personal statistics page
+MY_STATISTICS_STATUS_LABELS = {
+    "pending": "Pending",
+    "payment_pending": "Awaiting",
+    "payment_received": "Received",
+    "payment_confirmed": "Confirmed",
+    "in_progress": "In Process",
+    "ready": "Ready",
+    "completed": "Done",
+    "cancelled": "Cancelled",
+}
+
+MY_STATISTICS_STATUS_COLORS = {
+    "pending": "#FF9F29",
+    "payment_pending": "#6C757D",
+    "payment_received": "#17A2B8",
+    "payment_confirmed": "#28A745",
+    "in_progress": "#487FFF",
+    "ready": "#6F42C1",
+    "completed": "#45B369",
+    "cancelled": "#DC3545",
+}
+
+
 @login_required(login_url="admin_login")
 def my_statistics(request):
     """
@@ -958,10 +1212,10 @@ def my_statistics(request):
 
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
-    trunc_func = period_data["trunc_func"]
-    date_format = period_data["date_format"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
+    trunc_func = period_data.trunc_func
+    date_format = period_data.date_format
 
     today = timezone.now()
     today_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -970,9 +1224,7 @@ def my_statistics(request):
     year_start = today_start.replace(month=1, day=1)
 
     # Get admin profile
-    admin_profile = None
-    if hasattr(request.user, "admin_profile"):
-        admin_profile = request.user.admin_profile
+    admin_profile = getattr(request.user, "admin_profile", None)
 
     # Get only orders assigned to this user
     if admin_profile:
@@ -983,109 +1235,109 @@ def my_statistics(request):
     # Orders for selected period
     period_orders = my_orders.filter(created_at__gte=date_from, created_at__lte=date_to)
 
-    # Today's stats
-    today_orders = my_orders.filter(created_at__gte=today_start)
-    today_count = today_orders.count()
-    today_completed = today_orders.filter(status="completed").count()
-    today_pages = today_orders.aggregate(total=Sum("total_pages"))["total"] or 0
-
-    # This week's stats
-    week_orders = my_orders.filter(created_at__gte=week_start)
-    week_count = week_orders.count()
-    week_completed = week_orders.filter(status="completed").count()
-    week_pages = week_orders.aggregate(total=Sum("total_pages"))["total"] or 0
-
-    # This month's stats
-    month_orders = my_orders.filter(created_at__gte=month_start)
-    month_count = month_orders.count()
-    month_completed = month_orders.filter(status="completed").count()
-    month_pages = month_orders.aggregate(total=Sum("total_pages"))["total"] or 0
-
-    # This year's stats
-    year_orders = my_orders.filter(created_at__gte=year_start)
-    year_count = year_orders.count()
-    year_completed = year_orders.filter(status="completed").count()
-    year_pages = year_orders.aggregate(total=Sum("total_pages"))["total"] or 0
-
-    # All time stats
-    total_count = my_orders.count()
-    total_completed = my_orders.filter(status="completed").count()
-    total_pages = my_orders.aggregate(total=Sum("total_pages"))["total"] or 0
-
-    # Completion rate
-    completion_rate = (
-        round((total_completed / total_count * 100), 1) if total_count > 0 else 0
+    # Today/week/month/year/all-time counts, completions and pages in one query
+    windows = {
+        "today": Q(created_at__gte=today_start),
+        "week": Q(created_at__gte=week_start),
+        "month": Q(created_at__gte=month_start),
+        "year": Q(created_at__gte=year_start),
+        "total": Q(),
+    }
+    aggregates = {}
+    for name, window in windows.items():
+        aggregates[f"{name}_count"] = Count("id", filter=window)
+        aggregates[f"{name}_completed"] = Count("id", filter=window & Q(status="completed"))
+        aggregates[f"{name}_pages"] = Sum("total_pages", filter=window)
+    # All-time completion rate (NULL when there are no orders)
+    aggregates["completion_rate"] = ExpressionWrapper(
+        100.0 * Count("id", filter=Q(status="completed")) / NullIf(Count("id"), 0),
+        output_field=FloatField(),
     )
+    stats = my_orders.aggregate(**aggregates)
 
-    # Status breakdown for selected period
-    status_breakdown = (
-        period_orders.values("status").annotate(count=Count("id")).order_by("-count")
-    )
+    today_count = stats["today_count"]
+    today_completed = stats["today_completed"]
+    today_pages = stats["today_pages"] or 0
 
-    STATUS_LABELS = {
-        "pending": "Pending",
-        "payment_pending": "Awaiting",
-        "payment_received": "Received",
-        "payment_confirmed": "Confirmed",
-        "in_progress": "In Process",
-        "ready": "Ready",
-        "completed": "Done",
-        "cancelled": "Cancelled",
-    }
+    week_count = stats["week_count"]
+    week_completed = stats["week_completed"]
+    week_pages = stats["week_pages"] or 0
 
-    STATUS_COLORS = {
-        "pending": "#FF9F29",
-        "payment_pending": "#6C757D",
-        "payment_received": "#17A2B8",
-        "payment_confirmed": "#28A745",
-        "in_progress": "#487FFF",
-        "ready": "#6F42C1",
-        "completed": "#45B369",
-        "cancelled": "#DC3545",
-    }
+    month_count = stats["month_count"]
+    month_completed = stats["month_completed"]
+    month_pages = stats["month_pages"] or 0
 
-    status_data = []
-    for item in status_breakdown:
-        status_data.append(
-            {
-                "status": item["status"],
-                "label": STATUS_LABELS.get(item["status"], item["status"]),
-                "count": item["count"],
-                "color": STATUS_COLORS.get(item["status"], "#6C757D"),
-            }
-        )
+    year_count = stats["year_count"]
+    year_completed = stats["year_completed"]
+    year_pages = stats["year_pages"] or 0
+
+    total_count = stats["total_count"]
+    total_completed = stats["total_completed"]
+    total_pages = stats["total_pages"] or 0
 
-    # Daily performance for selected period (chart data)
-    daily_performance = (
+    completion_rate = round(stats["completion_rate"] or 0, 1)
+
+    # Status breakdown and daily performance for the selected period, rolled up
+    # from one scan grouped by (status, period)
+    breakdown_rows = (
         period_orders.annotate(period=trunc_func("created_at"))
-        .values("period")
+        .values_list("status", "period")
         .annotate(count=Count("id"), pages=Sum("total_pages"))
         .order_by("period")
     )
+    status_counts = defaultdict(int)
+    period_totals = {}
+    for status, period_start, count, pages in breakdown_rows:
+        status_counts[status] += count
+        if period_start:
+            totals = period_totals.setdefault(period_start, [0, 0])
+            totals[0] += count
+            totals[1] += pages or 0
+
+    status_data = [
+        {
+            "status": status,
+            "label": MY_STATISTICS_STATUS_LABELS.get(status, status),
+            "count": count,
+            "color": MY_STATISTICS_STATUS_COLORS.get(status, "#6C757D"),
+        }
+        for status, count in sorted(
+            status_counts.items(), key=lambda item: (-item[1], item[0])
+        )
+    ]
 
-    daily_labels = []
-    daily_counts = []
-    daily_pages = []
-    for item in daily_performance:
-        if item["period"]:
-            daily_labels.append(item["period"].strftime(date_format))
-            daily_counts.append(item["count"])
-            daily_pages.append(item["pages"] or 0)
-
-    # Recent orders (last 10)
-    recent_orders = my_orders.select_related("bot_user", "product").order_by(
-        "-created_at"
-    )[:10]
+    # Daily performance (chart data)
+    daily_labels = [period_start.strftime(date_format) for period_start in period_totals]
+    daily_counts = [count for count, _ in period_totals.values()]
+    daily_pages = [pages for _, pages in period_totals.values()]
+
+    # Recent orders (last 10), loading only the columns the table renders
+    recent_orders = (
+        my_orders.select_related("bot_user", "product")
+        .only(
+            "id",
+            "status",
+            "total_pages",
+            "created_at",
+            "bot_user__name",
+            "bot_user__phone",
+            # Every translation of the product name, so language fallback needs no query
+            "product__name_uz",
+            "product__name_ru",
+            "product__name_en",
+        )
+        .order_by("-created_at")[:10]
+    )
 
     context = {
         "title": "My Statistics",
         "subTitle": "Your Personal Performance",
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Today
         "today_count": today_count,
         "today_completed": today_completed,
@@ -1108,10 +1360,10 @@ def my_statistics(request):
         "total_pages": total_pages,
         "completion_rate": completion_rate,
         # Chart data
-        "status_data": json.dumps(status_data),
-        "daily_labels": json.dumps(daily_labels),
-        "daily_counts": json.dumps(daily_counts),
-        "daily_pages": json.dumps(daily_pages),
+        "status_data": _chart_json(status_data),
+        "daily_labels": _chart_json(daily_labels),
+        "daily_counts": _chart_json(daily_counts),
+        "daily_pages": _chart_json(daily_pages),
         # Recent orders
         "recent_orders": recent_orders,
     }
@@ -1128,14 +1380,12 @@ def unit_economy(request):
     Unit Economy Analytics View
     Shows remaining debts/receivables broken down by branch, client type, and center.
     """
-    from services.analytics import (
-        get_remaining_balance_summary,
-        get_remaining_by_branch,
-        get_remaining_by_client_type,
-        get_remaining_by_center,
-        get_top_debtors,
-    )
-    
+    context = _cached_report_context(request, "unit_economy", _unit_economy_context)
+    return render(request, "reports/unit_economy.html", context)
+
+
+def _unit_economy_context(request):
+    """Build the unit economy context (remaining balances and their breakdowns)"""
     # Period filter
     period = request.GET.get("period", "month")
     custom_from = request.GET.get("date_from")
@@ -1143,15 +1393,15 @@ def unit_economy(request):
     
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
     
     # Get branch and center filters
     branch_id = request.GET.get("branch")
     center_id = request.GET.get("center")
     
-    # Get available branches for filter
-    branches = get_user_branches(request.user)
+    # Get available branches for filter (center is joined for the filter labels)
+    branches = get_user_branches(request.user).select_related("center")
     
     # Center filter for superuser
     centers = None
@@ -1161,9 +1411,8 @@ def unit_economy(request):
             branches = branches.filter(center_id=center_id)
     
     # Check if user is owner
-    is_owner = False
-    if hasattr(request.user, "admin_profile") and request.user.admin_profile:
-        is_owner = request.user.admin_profile.is_owner
+    admin_profile = getattr(request.user, "admin_profile", None)
+    is_owner = bool(admin_profile and admin_profile.is_owner)
     
     # Get analytics data with date filtering
     summary = get_remaining_balance_summary(request.user, date_from=date_from, date_to=date_to)
@@ -1172,27 +1421,31 @@ def unit_economy(request):
     by_center = get_remaining_by_center(request.user, date_from=date_from, date_to=date_to)
     top_debtors = get_top_debtors(request.user, date_from=date_from, date_to=date_to)
     
-    # Prepare chart data for branch remaining
-    branch_labels = [b['branch_name'] for b in by_branch]
-    branch_remaining_values = [b['remaining'] for b in by_branch]
+    # Prepare chart data for branch remaining (labels and values in one pass)
+    branch_labels, branch_remaining_values = (
+        map(list, zip(*[(b['branch_name'], b['remaining']) for b in by_branch]))
+        if by_branch else ([], [])
+    )
     
     # Prepare chart data for client type
     client_type_labels = [by_client_type['agency']['label'], by_client_type['regular']['label']]
     client_type_values = [by_client_type['agency']['remaining'], by_client_type['regular']['remaining']]
     
     # Prepare chart data for center
-    center_labels = [c['center_name'] for c in by_center]
-    center_remaining_values = [c['remaining'] for c in by_center]
+    center_labels, center_remaining_values = (
+        map(list, zip(*[(c['center_name'], c['remaining']) for c in by_center]))
+        if by_center else ([], [])
+    )
     
     context = {
         "title": "Unit Economy",
         "subTitle": "Reports / Unit Economy",
         # Period filter
-        "period": period_data["period"],
-        "period_label": period_data["label"],
+        "period": period_data.period,
+        "period_label": period_data.label,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data["date_from_str"],
-        "date_to": period_data["date_to_str"],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
         # Filters
         "branches": branches,
         "selected_branch": branch_id,
@@ -1213,26 +1466,41 @@ def unit_economy(request):
         "by_center": by_center,
         "top_debtors": top_debtors,
         # Chart data
-        "branch_labels": json.dumps(branch_labels),
-        "branch_remaining_values": json.dumps(branch_remaining_values),
-        "client_type_labels": json.dumps(client_type_labels),
-        "client_type_values": json.dumps(client_type_values),
-        "center_labels": json.dumps(center_labels),
-        "center_remaining_values": json.dumps(center_remaining_values),
+        "branch_labels": _chart_json(branch_labels),
+        "branch_remaining_values": _chart_json(branch_remaining_values),
+        "client_type_labels": _chart_json(client_type_labels),
+        "client_type_values": _chart_json(client_type_values),
+        "center_labels": _chart_json(center_labels),
+        "center_remaining_values": _chart_json(center_remaining_values),
     }
-    
-    return render(request, "reports/unit_economy.html", context)
+    return context
+
+
+def _unit_economy_api_etag(request):
+    """
+    ETag for unit_economy_api: changes when the reports cache version moves
+    (order/expense writes) or the period window rolls over to a new day.
+    """
+    period_data = get_period_dates(
+        request.GET.get("period", "month"),
+        request.GET.get("date_from"),
+        request.GET.get("date_to"),
+    )
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.GET.items()))
+    return hashlib.md5(
+        f"{get_reports_cache_version()}:{request.user.id}:"
+        f"{period_data.date_from_str}:{period_data.date_to_str}:{params}".encode()
+    ).hexdigest()
 
 
 @login_required(login_url="admin_login")
 @permission_required('can_view_financial_reports')
+@condition(etag_func=_unit_economy_api_etag)
 def unit_economy_api(request):
     """
     API endpoint for Unit Economy data.
     Returns JSON for AJAX requests / dashboard widgets.
     """
-    from services.analytics import get_top_debtors
-    
     # Get filters
     period = request.GET.get("period", "month")
     custom_from = request.GET.get("date_from")
@@ -1243,8 +1511,8 @@ def unit_economy_api(request):
     
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
     
     # Get all debtors (no limit)
     all_debtors = get_top_debtors(request.user, limit=None, date_from=date_from, date_to=date_to)
@@ -1271,9 +1539,8 @@ def unit_economy_api(request):
         centers = TranslationCenter.objects.filter(is_active=True)
     
     # Check if user is owner
-    is_owner = False
-    if hasattr(request.user, "admin_profile") and request.user.admin_profile:
-        is_owner = request.user.admin_profile.is_owner
+    admin_profile = getattr(request.user, "admin_profile", None)
+    is_owner = bool(admin_profile and admin_profile.is_owner)
     
     centers_data = [{'id': c.id, 'name': c.name} for c in centers] if centers else []
     branches_data = [{'id': b.id, 'name': b.name, 'center_id': b.center_id} for b in branches]
@@ -1296,8 +1563,6 @@ def debtors_report(request):
     Dedicated page for viewing and managing debtors with advanced filtering.
     Respects RBAC - users see only debtors from their accessible branches.
     """
-    from services.analytics import get_top_debtors
-    
     # Get filters
     period = request.GET.get("period", "month")
     custom_from = request.GET.get("date_from")
@@ -1313,8 +1578,8 @@ def debtors_report(request):
     
     # Get period dates
     period_data = get_period_dates(period, custom_from, custom_to)
-    date_from = period_data["date_from"]
-    date_to = period_data["date_to"]
+    date_from = period_data.date_from
+    date_to = period_data.date_to
     
     # Get all debtors
     all_debtors = get_top_debtors(request.user, limit=None, date_from=date_from, date_to=date_to)
@@ -1398,9 +1663,8 @@ def debtors_report(request):
         centers = TranslationCenter.objects.filter(is_active=True)
     
     # Check user permissions for showing center/branch columns
-    is_owner = False
-    if hasattr(request.user, "admin_profile") and request.user.admin_profile:
-        is_owner = request.user.admin_profile.is_owner
+    admin_profile = getattr(request.user, "admin_profile", None)
+    is_owner = bool(admin_profile and admin_profile.is_owner)
     
     show_center = request.user.is_superuser or is_owner
     show_branch = True
@@ -1423,7 +1687,7 @@ def debtors_report(request):
         # Filters
         'period': period,
         'period_choices': PERIOD_CHOICES,
-        'period_label': period_data.get('label', ''),
+        'period_label': period_data.label,
         'date_from': custom_from or '',
         'date_to': custom_to or '',
         'client_type': client_type,
@@ -1440,9 +1704,25 @@ def debtors_report(request):
     return render(request, "reports/debtors_report.html", context)
 
 
+# Cache timeout for expense analytics reports (5 minutes); order and expense
+# changes invalidate them earlier through the cache version
+EXPENSE_ANALYTICS_CACHE_TIMEOUT = 300
+
+
 @login_required(login_url="admin_login")
 @any_permission_required('can_view_expenses', 'can_manage_expenses', 'can_view_financial_reports')
 def expense_analytics_report(request):
+    """
+    Expense analytics report. The computed context is cached per user and filter
+    combination until orders or expenses change.
+    """
+    context = _cached_report_context(
+        request, "expense_analytics", _expense_analytics_context, EXPENSE_ANALYTICS_CACHE_TIMEOUT
+    )
+    return render(request, "reports/expense_analytics.html", context)
+
+
+def _expense_analytics_context(request):
     """
     Detailed expense analytics report with hierarchical breakdown:
     - Superuser: See all centers with their branches
@@ -1473,7 +1753,10 @@ def expense_analytics_report(request):
     
     # Get accessible centers and branches based on RBAC
     accessible_centers = []
-    accessible_branches = get_user_branches(request.user)
+    # Only the columns rendered below; center is joined for branch.center.name
+    accessible_branches = get_user_branches(request.user).select_related('center').only(
+        'id', 'name', 'center__id', 'center__name'
+    )
     
     # Determine if user is center owner or just has permissions
     is_center_owner = False
@@ -1483,8 +1766,8 @@ def expense_analytics_report(request):
     
     # Filter orders by user access level and date range
     orders_base = Order.objects.filter(
-        created_at__gte=period_data['date_from'],
-        created_at__lte=period_data['date_to']
+        created_at__gte=period_data.date_from,
+        created_at__lte=period_data.date_to
     ).select_related('product', 'branch', 'branch__center', 'bot_user')
     
     if is_superuser:
@@ -1513,7 +1796,9 @@ def expense_analytics_report(request):
         accessible_branches = accessible_branches.filter(id=branch_id)
     
     # Get all expenses with access filtering
-    expenses = get_user_expenses(request.user).select_related('branch', 'branch__center')
+    expenses = get_user_expenses(request.user).select_related('branch').only(
+        'id', 'name', 'price_for_original', 'price_for_copy', 'expense_type', 'branch__name'
+    )
     
     # Apply same filters to expenses
     if is_superuser and center_id:
@@ -1531,287 +1816,208 @@ def expense_analytics_report(request):
     if expense_type_filter in ['b2b', 'b2c']:
         expenses = expenses.filter(expense_type__in=[expense_type_filter, 'both'])
     
+    # Copy-aware costs per (center, branch, expense), computed once in SQL and
+    # shared by the center and branch breakdowns below
+    center_rollup = defaultdict(lambda: {'total': Decimal('0'), 'count': 0})
+    branch_rollup = defaultdict(lambda: {
+        'total': Decimal('0'),
+        'count': 0,
+        'b2b': Decimal('0'),
+        'b2c': Decimal('0'),
+        'both': Decimal('0'),
+    })
+    usage_rows = (
+        orders_base.filter(product__expenses__in=expenses)
+        .values(
+            'branch__center_id', 'branch_id', 'product__expenses__id',
+            'product__expenses__branch_id', 'product__expenses__branch__center_id',
+            'product__expenses__expense_type',
+        )
+        .annotate(n=Count('id', distinct=True), total=Sum(_ORDER_EXPENSE_COST))
+        .order_by()
+    )
+    for row in usage_rows:
+        # A center only accounts for its own expenses
+        if row['product__expenses__branch__center_id'] == row['branch__center_id']:
+            rollup = center_rollup[row['branch__center_id']]
+            rollup['total'] += row['total'] or Decimal('0')
+            rollup['count'] += row['n']
+        
+        # A branch only accounts for its own expenses
+        if row['product__expenses__branch_id'] == row['branch_id']:
+            expense_type = row['product__expenses__expense_type']
+            rollup = branch_rollup[row['branch_id']]
+            rollup['total'] += row['total'] or Decimal('0')
+            rollup['count'] += row['n']
+            rollup[expense_type if expense_type in ('b2b', 'b2c') else 'both'] += row['total'] or Decimal('0')
+    
     # Calculate expense totals based on actual order usage
-    # For each expense, find how many orders use it (through products) and multiply by expense price
+    # For each expense, count the orders using it (through products) and sum their
+    # cost: price_for_original + (price_for_copy * copy_number) per order
+    in_period = Q(products__order__in=orders_base)
+    expenses_with_usage = expenses.annotate(
+        order_count=Count('products__order', filter=in_period, distinct=True),
+        total_cost=Sum(_EXPENSE_ORDER_COST, filter=in_period),
+    ).order_by('-created_at')  # Meta.ordering is not applied to GROUP BY queries
     expense_usage = {}
-    total_expense_cost = Decimal('0')
-    b2b_expense_cost = Decimal('0')
-    b2c_expense_cost = Decimal('0')
-    both_expense_cost = Decimal('0')
-    
-    for expense in expenses:
-        # Get products that use this expense
-        products_with_expense = expense.products.all()
-        
-        # Get orders that use these products
-        related_orders = orders_base.filter(product__in=products_with_expense)
-        order_count = related_orders.count()
-        
-        # Calculate total cost for this expense using new pricing model:
-        # Each order gets: price_for_original + (price_for_copy * copy_number)
-        expense_total = Decimal('0')
-        for order in related_orders:
-            expense_total += expense.price_for_original + (expense.price_for_copy * (order.copy_number or 0))
-        
+    
+    for expense in expenses_with_usage:
         expense_usage[expense.id] = {
             'expense': expense,
-            'order_count': order_count,
-            'total_cost': expense_total
+            'order_count': expense.order_count,
+            'total_cost': expense.total_cost or Decimal('0')
         }
-        
-        total_expense_cost += expense_total
-        
-        # Track by type
-        if expense.expense_type == 'b2b':
-            b2b_expense_cost += expense_total
-        elif expense.expense_type == 'b2c':
-            b2c_expense_cost += expense_total
-        else:  # 'both'
-            both_expense_cost += expense_total
-    
-    # Calculate totals
-    total_expenses = {
-        'total': total_expense_cost,
-        'count': sum(e['order_count'] for e in expense_usage.values())
-    }
     
-    # B2B/B2C breakdown
-    b2b_expenses = {
-        'total': b2b_expense_cost,
-        'count': sum(e['order_count'] for e in expense_usage.values() if e['expense'].expense_type == 'b2b')
-    }
-    b2c_expenses = {
-        'total': b2c_expense_cost,
-        'count': sum(e['order_count'] for e in expense_usage.values() if e['expense'].expense_type == 'b2c')
-    }
-    both_expenses = {
-        'total': both_expense_cost,
-        'count': sum(e['order_count'] for e in expense_usage.values() if e['expense'].expense_type == 'both')
-    }
+    # Totals and B2B/B2C breakdown in one aggregate over (order, expense) pairs
+    is_b2b = Q(product__expenses__expense_type='b2b')
+    is_b2c = Q(product__expenses__expense_type='b2c')
+    is_both = ~Q(product__expenses__expense_type__in=['b2b', 'b2c'])
+    summary = orders_base.filter(product__expenses__in=expenses).aggregate(
+        total=Sum(_ORDER_EXPENSE_COST),
+        total_count=Count('id'),
+        b2b_total=Sum(_ORDER_EXPENSE_COST, filter=is_b2b),
+        b2b_count=Count('id', filter=is_b2b),
+        b2c_total=Sum(_ORDER_EXPENSE_COST, filter=is_b2c),
+        b2c_count=Count('id', filter=is_b2c),
+        both_total=Sum(_ORDER_EXPENSE_COST, filter=is_both),
+        both_count=Count('id', filter=is_both),
+    )
+    total_expenses = {'total': summary['total'] or Decimal('0'), 'count': summary['total_count']}
+    b2b_expenses = {'total': summary['b2b_total'] or Decimal('0'), 'count': summary['b2b_count']}
+    b2c_expenses = {'total': summary['b2c_total'] or Decimal('0'), 'count': summary['b2c_count']}
+    both_expenses = {'total': summary['both_total'] or Decimal('0'), 'count': summary['both_count']}
     
     # Analytics by center (for superuser)
     by_center = []
     if is_superuser:
-        for center in accessible_centers:
-            center_orders = orders_base.filter(branch__center=center)
-            center_expenses = expenses.filter(branch__center=center)
-            
-            center_total = Decimal('0')
-            center_count = 0
-            
-            # Calculate center expense totals
-            for expense in center_expenses:
-                products_with_expense = expense.products.all()
-                related_orders = center_orders.filter(product__in=products_with_expense)
-                order_count = related_orders.count()
-                for order in related_orders:
-                    center_total += expense.price_for_original + (expense.price_for_copy * (order.copy_number or 0))
-                center_count += order_count
+        centers_with_branches = accessible_centers.prefetch_related(
+            Prefetch(
+                'branches',
+                queryset=Branch.objects.filter(is_active=True).only('id', 'name', 'center'),
+                to_attr='active_branches',
+            )
+        )
+        for center in centers_with_branches:
+            center_totals = center_rollup.get(center.id, {'total': Decimal('0'), 'count': 0})
             
             # Get branch breakdown for this center
             center_branches_data = []
-            for branch in center.branches.filter(is_active=True):
-                branch_orders = center_orders.filter(branch=branch)
-                branch_expenses = center_expenses.filter(branch=branch)
-                
-                branch_total = Decimal('0')
-                branch_count = 0
-                branch_b2b = Decimal('0')
-                branch_b2c = Decimal('0')
-                branch_both = Decimal('0')
-                
-                for expense in branch_expenses:
-                    products_with_expense = expense.products.all()
-                    related_orders = branch_orders.filter(product__in=products_with_expense)
-                    order_count = related_orders.count()
-                    expense_total = Decimal('0')
-                    for order in related_orders:
-                        expense_total += expense.price_for_original + (expense.price_for_copy * (order.copy_number or 0))
-                    
-                    branch_total += expense_total
-                    branch_count += order_count
-                    
-                    if expense.expense_type == 'b2b':
-                        branch_b2b += expense_total
-                    elif expense.expense_type == 'b2c':
-                        branch_b2c += expense_total
-                    else:
-                        branch_both += expense_total
-                
-                if branch_total > 0:  # Only include branches with expenses
+            for branch in center.active_branches:
+                rollup = branch_rollup.get(branch.id)
+                if rollup and rollup['total'] > 0:  # Only include branches with expenses
                     center_branches_data.append({
                         'branch__id': branch.id,
                         'branch__name': branch.name,
-                        'total': branch_total,
-                        'count': branch_count,
-                        'b2b_total': branch_b2b,
-                        'b2c_total': branch_b2c,
-                        'both_total': branch_both
+                        'total': rollup['total'],
+                        'count': rollup['count'],
+                        'b2b_total': rollup['b2b'],
+                        'b2c_total': rollup['b2c'],
+                        'both_total': rollup['both']
                     })
             
-            center_branches_data.sort(key=lambda x: x['total'], reverse=True)
+            center_branches_data.sort(key=itemgetter('total'), reverse=True)
             
             by_center.append({
                 'center': center,
-                'total': center_total,
-                'count': center_count,
+                'total': center_totals['total'],
+                'count': center_totals['count'],
                 'branches': center_branches_data
             })
     
     # Analytics by branch (for center-level and branch-level users)
     by_branch_data = []
     for branch in accessible_branches:
-        branch_orders = orders_base.filter(branch=branch)
-        branch_expenses = expenses.filter(branch=branch)
-        
-        branch_total = Decimal('0')
-        branch_count = 0
-        branch_b2b = Decimal('0')
-        branch_b2c = Decimal('0')
-        branch_both = Decimal('0')
-        
-        for expense in branch_expenses:
-            products_with_expense = expense.products.all()
-            related_orders = branch_orders.filter(product__in=products_with_expense)
-            order_count = related_orders.count()
-            expense_total = Decimal('0')
-            for order in related_orders:
-                expense_total += expense.price_for_original + (expense.price_for_copy * (order.copy_number or 0))
-            
-            branch_total += expense_total
-            branch_count += order_count
-            
-            if expense.expense_type == 'b2b':
-                branch_b2b += expense_total
-            elif expense.expense_type == 'b2c':
-                branch_b2c += expense_total
-            else:
-                branch_both += expense_total
-        
-        if branch_total > 0:  # Only include branches with expenses
+        rollup = branch_rollup.get(branch.id)
+        if rollup and rollup['total'] > 0:  # Only include branches with expenses
+            branch_total = rollup['total']
+            branch_count = rollup['count']
             by_branch_data.append({
                 'branch__id': branch.id,
                 'branch__name': branch.name,
                 'branch__center__name': branch.center.name,
                 'total': branch_total,
                 'count': branch_count,
-                'b2b_total': branch_b2b,
-                'b2c_total': branch_b2c,
-                'both_total': branch_both,
+                'b2b_total': rollup['b2b'],
+                'b2c_total': rollup['b2c'],
+                'both_total': rollup['both'],
                 'avg_expense': branch_total / branch_count if branch_count > 0 else Decimal('0')
             })
     
-    by_branch_data.sort(key=lambda x: x['total'], reverse=True)
+    by_branch_data.sort(key=itemgetter('total'), reverse=True)
     
     # Top expenses by total cost (price * usage)
-    top_expenses_list = []
-    for expense_id, data in expense_usage.items():
-        top_expenses_list.append({
-            'expense': data['expense'],
-            'order_count': data['order_count'],
-            'total_cost': data['total_cost']
-        })
-    top_expenses_list.sort(key=lambda x: x['total_cost'], reverse=True)
-    top_expenses = top_expenses_list[:10]
-    
-    # Expense type distribution
-    type_distribution = [
-        {'expense_type': 'b2b', 'total': b2b_expense_cost, 'count': b2b_expenses['count']},
-        {'expense_type': 'b2c', 'total': b2c_expense_cost, 'count': b2c_expenses['count']},
-        {'expense_type': 'both', 'total': both_expense_cost, 'count': both_expenses['count']},
-    ]
-    type_distribution = [t for t in type_distribution if t['total'] > 0]  # Remove empty types
-    
-    # Additional statistics
-    if expense_usage:
-        all_costs = [e['total_cost'] for e in expense_usage.values() if e['total_cost'] > 0]
-        expense_stats = {
-            'max_price': max(all_costs) if all_costs else Decimal('0'),
-            'min_price': min(all_costs) if all_costs else Decimal('0'),
-            'avg_price': sum(all_costs) / len(all_costs) if all_costs else Decimal('0')
-        }
-    else:
-        expense_stats = {
-            'max_price': Decimal('0'),
-            'min_price': Decimal('0'),
-            'avg_price': Decimal('0')
-        }
+    top_expenses = heapq.nlargest(10, expense_usage.values(), key=itemgetter('total_cost'))
+    
+    # Expense type distribution (empty types are skipped) with its chart series
+    type_distribution = []
+    type_labels = []
+    type_values = []
+    for expense_type, label, data in (
+        ('b2b', 'B2B (Agency/Business)', b2b_expenses),
+        ('b2c', 'B2C (Individual Customer)', b2c_expenses),
+        ('both', 'Both B2B & B2C', both_expenses),
+    ):
+        if data['total'] > 0:
+            type_distribution.append({'expense_type': expense_type, 'total': data['total'], 'count': data['count']})
+            type_labels.append(label)
+            type_values.append(float(data['total']))
+    
+    # Additional statistics over used expenses, computed in the database
+    expense_costs = expenses_with_usage.filter(total_cost__gt=0)
+    stats_aggregates = {
+        'max_price': Max('total_cost'),
+        'min_price': Min('total_cost'),
+        'avg_price': Avg('total_cost'),
+    }
+    if connection.vendor == 'postgresql':
+        stats_aggregates['median'] = _Median('total_cost')
+    cost_stats = expense_costs.aggregate(**stats_aggregates)
+    expense_stats = {
+        'max_price': cost_stats['max_price'] or Decimal('0'),
+        'min_price': cost_stats['min_price'] or Decimal('0'),
+        'avg_price': cost_stats['avg_price'] or Decimal('0'),
+    }
     
     # Calculate median
-    median_expense = Decimal('0')
-    if expense_usage:
-        sorted_costs = sorted([e['total_cost'] for e in expense_usage.values() if e['total_cost'] > 0])
-        if sorted_costs:
-            middle_index = len(sorted_costs) // 2
-            if len(sorted_costs) % 2 == 0:
-                median_expense = (sorted_costs[middle_index - 1] + sorted_costs[middle_index]) / 2
-            else:
-                median_expense = sorted_costs[middle_index]
+    if 'median' in cost_stats:
+        median_expense = Decimal(str(round(cost_stats['median'] or 0, 2)))
+    else:
+        # PERCENTILE_CONT is not available on SQLite
+        used_costs = [e['total_cost'] for e in expense_usage.values() if e['total_cost'] > 0]
+        median_expense = statistics.median(used_costs) if used_costs else Decimal('0')
     
     # Monthly trend (if period is long enough)
     monthly_trend = []
     monthly_trend_labels = []
     monthly_trend_values = []
-    if (period_data['date_to'] - period_data['date_from']).days > 31:
-        # Group orders by month and calculate expense costs
-        from django.db.models.functions import TruncMonth
-        monthly_orders = orders_base.annotate(
-            month=TruncMonth('created_at')
-        ).values('month', 'product').annotate(
-            order_count=Count('id')
+    if (period_data.date_to - period_data.date_from).days > 31:
+        # Sum copy-aware expense costs per month in a single grouped query
+        monthly_rows = (
+            orders_base.filter(product__expenses__in=expenses)
+            .annotate(month=TruncMonth('created_at'))
+            .values('month')
+            .annotate(total=Sum(_ORDER_EXPENSE_COST))
+            .order_by('month')
         )
-        
-        # Build monthly trend data
-        monthly_data = {}
-        for item in monthly_orders:
-            month = item['month']
-            product_id = item['product']
-            order_count = item['order_count']
-            
-            # Find expenses for this product
-            from services.models import Product
-            try:
-                product = Product.objects.get(id=product_id)
-                # Get orders for this month/product to calculate copy-aware expense
-                month_orders = orders_base.filter(
-                    product_id=product_id,
-                    created_at__year=month.year,
-                    created_at__month=month.month
-                )
-                for expense in product.expenses.all():
-                    if expense.id in expense_usage:
-                        if month not in monthly_data:
-                            monthly_data[month] = Decimal('0')
-                        # Calculate with copy-aware pricing
-                        for order in month_orders:
-                            monthly_data[month] += expense.price_for_original + (expense.price_for_copy * (order.copy_number or 0))
-            except Product.DoesNotExist:
-                pass
-        
-        # Sort by month
-        sorted_months = sorted(monthly_data.items())
-        for month_date, total in sorted_months:
+        for item in monthly_rows.iterator(chunk_size=2000):
+            month_date = item['month']
+            total = item['total'] or Decimal('0')
             monthly_trend.append({'month': month_date, 'total': total, 'count': 0})
             monthly_trend_labels.append(month_date.strftime('%b %Y') if month_date else 'N/A')
-            monthly_trend_values.append(float(total or 0))
-    
-    # Prepare chart data
-    branch_labels = [item['branch__name'] for item in by_branch_data[:10]]
-    branch_totals = [float(item['total'] or 0) for item in by_branch_data[:10]]
-    branch_b2b = [float(item['b2b_total'] or 0) for item in by_branch_data[:10]]
-    branch_b2c = [float(item['b2c_total'] or 0) for item in by_branch_data[:10]]
-    branch_both = [float(item['both_total'] or 0) for item in by_branch_data[:10]]
-    
-    type_labels = []
-    type_values = []
-    for item in type_distribution:
-        if item['expense_type'] == 'b2b':
-            type_labels.append('B2B (Agency/Business)')
-        elif item['expense_type'] == 'b2c':
-            type_labels.append('B2C (Individual Customer)')
-        else:
-            type_labels.append('Both B2B & B2C')
-        type_values.append(float(item['total'] or 0))
+            monthly_trend_values.append(float(total))
+    
+    # Prepare chart data for the top 10 branches in a single pass
+    branch_labels = []
+    branch_totals = []
+    branch_b2b = []
+    branch_b2c = []
+    branch_both = []
+    for item in by_branch_data[:10]:
+        branch_labels.append(item['branch__name'])
+        branch_totals.append(float(item['total'] or 0))
+        branch_b2b.append(float(item['b2b_total'] or 0))
+        branch_b2c.append(float(item['b2c_total'] or 0))
+        branch_both.append(float(item['both_total'] or 0))
     
     context = {
         "title": "Expense Analytics Report",
@@ -1819,9 +2025,9 @@ def expense_analytics_report(request):
         # Date filter
         "period": period,
         "period_choices": PERIOD_CHOICES,
-        "date_from": period_data['date_from_str'],
-        "date_to": period_data['date_to_str'],
-        "period_label": period_data['label'],
+        "date_from": period_data.date_from_str,
+        "date_to": period_data.date_to_str,
+        "period_label": period_data.label,
         # Filters
         "expense_type_filter": expense_type_filter,
         "centers": accessible_centers if is_superuser else [],
@@ -1853,15 +2059,15 @@ def expense_analytics_report(request):
         "type_distribution": type_distribution,
         "monthly_trend": monthly_trend,
         # Chart data
-        "branch_labels": json.dumps(branch_labels),
-        "branch_totals": json.dumps(branch_totals),
-        "branch_b2b": json.dumps(branch_b2b),
-        "branch_b2c": json.dumps(branch_b2c),
-        "branch_both": json.dumps(branch_both),
-        "type_labels": json.dumps(type_labels),
-        "type_values": json.dumps(type_values),
-        "monthly_trend_labels": json.dumps(monthly_trend_labels),
-        "monthly_trend_values": json.dumps(monthly_trend_values),
+        "branch_labels": _chart_json(branch_labels),
+        "branch_totals": _chart_json(branch_totals),
+        "branch_b2b": _chart_json(branch_b2b),
+        "branch_b2c": _chart_json(branch_b2c),
+        "branch_both": _chart_json(branch_both),
+        "type_labels": _chart_json(type_labels),
+        "type_values": _chart_json(type_values),
+        "monthly_trend_labels": _chart_json(monthly_trend_labels),
+        "monthly_trend_values": _chart_json(monthly_trend_values),
     }
     
-    return render(request, "reports/expense_analytics.html", context)
+    return context
@@ -99,58 +99,53 @@ urlpatterns = [
     path("finance", home_views.finance, name="finance"),
     # chart routes
   
-    # Reports & Analytics routes
-    path(
-        "reports/financial", reports_views.financial_reports, name="financial_reports"
-    ),
-    path("reports/orders", reports_views.order_reports, name="order_reports"),
-    path(
-        "reports/staff-performance",
-        reports_views.staff_performance,
-        name="staff_performance",
-    ),
-    path(
-        "reports/branch-comparison",
-        reports_views.branch_comparison,
-        name="branch_comparison",
-    ),
-    path(
-        "reports/customers", reports_views.customer_analytics, name="customer_analytics"
-    ),
-    path(
-        "reports/export/<str:report_type>",
-        reports_views.export_report,
-        name="export_report",
-    ),
     path(
         "my-statistics",
         reports_views.my_statistics,
         name="my_statistics",
     ),
-    # Unit Economy Analytics
-    path(
-        "reports/unit-economy",
-        reports_views.unit_economy,
-        name="unit_economy",
-    ),
     path(
         "api/unit-economy",
         reports_views.unit_economy_api,
         name="unit_economy_api",
     ),
-    # Debtors Management Page
-    path(
-        "reports/debtors",
-        reports_views.debtors_report,
-        name="debtors_report",
-    ),
-    # Audit Logs (also accessible via core/audit-logs/)
-    path("reports/audit-logs", home_views.audit_logs_redirect, name="audit_logs"),
-    # Expense Analytics Report
+    # Reports & Analytics routes (grouped so other URLs skip them with one prefix check)
     path(
-        "reports/expense-analytics",
-        reports_views.expense_analytics_report,
-        name="expense_analytics_report",
+        "reports/",
+        include(
+            [
+                path("financial", reports_views.financial_reports, name="financial_reports"),
+                path("orders", reports_views.order_reports, name="order_reports"),
+                path(
+                    "staff-performance",
+                    reports_views.staff_performance,
+                    name="staff_performance",
+                ),
+                path(
+                    "branch-comparison",
+                    reports_views.branch_comparison,
+                    name="branch_comparison",
+                ),
+                path("customers", reports_views.customer_analytics, name="customer_analytics"),
+                path(
+                    "export/<str:report_type>",
+                    reports_views.export_report,
+                    name="export_report",
+                ),
+                # Unit Economy Analytics
+                path("unit-economy", reports_views.unit_economy, name="unit_economy"),
+                # Debtors Management Page
+                path("debtors", reports_views.debtors_report, name="debtors_report"),
+                # Audit Logs (also accessible via core/audit-logs/)
+                path("audit-logs", home_views.audit_logs_redirect, name="audit_logs"),
+                # Expense Analytics Report
+                path(
+                    "expense-analytics",
+                    reports_views.expense_analytics_report,
+                    name="expense_analytics_report",
+                ),
+            ]
+        ),
     ),
 ]
 from django.conf import settings
@@ -1,11 +1,34 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import Group
+from django.utils import timezone
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from modeltranslation.translator import translator
 from accounts.models import BotUser, AdditionalInfo
 
 
 admin.site.unregister(Group)
 
+class CenterRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Related filter for Branch/BotUser choices, whose labels show the center"""
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        choices = (
+            field.remote_field.model._default_manager
+            .complex_filter(field.get_limit_choices_to())
+            .select_related('center')
+        )
+        if ordering:
+            choices = choices.order_by(*ordering)
+        return [(obj.pk, str(obj)) for obj in choices]
+
+
+# Fixed markup for the invite status column, rendered once per row
+INVITE_USED_HTML = mark_safe('<span style="color: orange;">🔒 Used</span>')
+INVITE_AVAILABLE_HTML = mark_safe('<span style="color: green;">✅ Available</span>')
+
 
 @admin.register(BotUser)
 class BotUserAdmin(admin.ModelAdmin):
@@ -22,17 +45,17 @@ class BotUserAdmin(admin.ModelAdmin):
         "is_active",
     )
     list_filter = (
-        "branch",
+        ("branch", CenterRelatedFieldListFilter),
         "language",
         "is_active",
         "is_agency",
         "is_used",
         "created_at",
-        "agency",
+        ("agency", CenterRelatedFieldListFilter),
     )
     search_fields = ("name", "username", "phone", "user_id", "agency_token")
     ordering = ("-created_at",)
-    list_select_related = ("agency", "branch")
+    list_select_related = ("agency", "branch", "branch__center")
     actions = ["mark_as_unused"]
     autocomplete_fields = ['branch', 'agency']
 
@@ -102,10 +125,7 @@ class BotUserAdmin(admin.ModelAdmin):
     def invitation_link_display(self, obj):
         """Display invitation link status in list view"""
         if obj.is_agency:
-            if obj.is_used:
-                return format_html('<span style="color: orange;">🔒 Used</span>')
-            else:
-                return format_html('<span style="color: green;">✅ Available</span>')
+            return INVITE_USED_HTML if obj.is_used else INVITE_AVAILABLE_HTML
         return "-"
 
     invitation_link_display.short_description = "Invite Status"
@@ -130,12 +150,10 @@ class BotUserAdmin(admin.ModelAdmin):
 
     def mark_as_unused(self, request, queryset):
         """Admin action to reset agency invitation links"""
-        updated = 0
-        for obj in queryset:
-            if obj.is_agency and obj.is_used:
-                obj.is_used = False
-                obj.save()
-                updated += 1
+        # One UPDATE; the BotUser save signals only react to is_active/is_agency
+        updated = queryset.filter(is_agency=True, is_used=True).update(
+            is_used=False, updated_at=timezone.now()
+        )
 
         if updated > 0:
             self.message_user(
@@ -152,7 +170,25 @@ class BotUserAdmin(admin.ModelAdmin):
     mark_as_unused.short_description = "Reset invitation link (mark as unused)"
 
     def get_queryset(self, request):
-        return super().get_queryset(request)
+        # __str__ shows the center name (autocomplete results, change/delete
+        # pages). The changelist skips list_select_related once the queryset
+        # already has select_related(), so include it here.
+        return super().get_queryset(request).select_related(
+            "center", *self.list_select_related
+        )
+
+
+class AdditionalInfoChangeList(ChangeList):
+    """Changelist that skips the translated texts the list never shows"""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        translated = translator.get_options_for_model(self.model).all_fields
+        deferred = [
+            name
+            for field_name, translation_fields in translated.items()
+            for name in (field_name, *(field.name for field in translation_fields))
+        ]
+        return super().get_queryset(request, exclude_parameters).defer(*deferred)
 
 
 @admin.register(AdditionalInfo)
@@ -166,7 +202,8 @@ class AdditionalInfoAdmin(admin.ModelAdmin):
         'support_phone',
         'updated_at',
     )
-    list_filter = ('branch__center', 'branch')
+    list_filter = ('branch__center', ('branch', CenterRelatedFieldListFilter))
+    list_select_related = ('branch', 'branch__center')
     search_fields = ('branch__name', 'bank_card', 'holder_name', 'support_phone')
     autocomplete_fields = ['branch']
     
@@ -233,3 +270,6 @@ class AdditionalInfoAdmin(admin.ModelAdmin):
             }
         ),
     )
+
+    def get_changelist(self, request, **kwargs):
+        return AdditionalInfoChangeList
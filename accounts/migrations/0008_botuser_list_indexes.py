@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_add_bot_user_state'),
+        ('organizations', '0022_role_can_delete_languages'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='botuser',
+            index=models.Index(fields=['created_at'], name='accounts_bo_created_8a9651_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='botuser',
+            index=models.Index(fields=['branch', 'created_at'], name='accounts_bo_branch__953d47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='botuser',
+            index=models.Index(fields=['agency', 'created_at'], name='accounts_bo_agency__8c7031_idx'),
+        ),
+    ]
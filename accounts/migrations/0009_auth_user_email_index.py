@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_botuser_list_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    # auth.User belongs to django.contrib.auth, so the index on its email
+    # column (used by the profile duplicate-email check and forgot_password)
+    # is created with raw SQL instead of a model field change.
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS accounts_auth_user_email_idx ON auth_user (email);',
+            reverse_sql='DROP INDEX IF EXISTS accounts_auth_user_email_idx;',
+        ),
+    ]
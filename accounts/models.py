@@ -1,13 +1,43 @@
+import copy
+import json
 import logging
+import time
 import uuid
 import os
-from django.db import models
-from django.db.models.signals import pre_save, post_save
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 logger = logging.getLogger(__name__)
 
+# Per-branch AdditionalInfo lookups are keyed on this version; bumping it
+# invalidates all of them at once (global/main branch info affects every branch)
+ADDITIONAL_INFO_CACHE_VERSION_KEY = "addinfo:version"
+ADDITIONAL_INFO_CACHE_TIMEOUT = 300
+
+CENTER_BOT_USERNAME_CACHE_TIMEOUT = 3600
+
+# Cached BotUser list counts are keyed on this version; any BotUser change
+# bumps it
+BOT_USERS_CACHE_VERSION_KEY = "botusers:version"
+
+
+def _get_center_bot_username(center_id):
+    """Return a center's configured bot username ("" if unset), cached."""
+    return cache.get_or_set(
+        f"center_bot_username:{center_id}",
+        lambda: apps.get_model('organizations', 'TranslationCenter').objects
+        .filter(pk=center_id).values_list('bot_username', flat=True).first() or "",
+        CENTER_BOT_USERNAME_CACHE_TIMEOUT,
+    )
+
 
 class AdditionalInfo(models.Model):
     """
@@ -149,34 +179,45 @@ class AdditionalInfo(models.Model):
         """
         Get AdditionalInfo for a branch.
         Falls back to: branch's info → main branch's info → global info → None
+        Results are cached; see invalidate_cache().
         """
-        if branch:
-            # Try to get branch-specific info
-            try:
-                return cls.objects.get(branch=branch)
-            except cls.DoesNotExist:
-                pass
-            
-            # Try to get main branch's info
-            try:
-                main_branch = branch.center.branches.filter(is_main=True).first()
-                if main_branch and main_branch != branch:
-                    return cls.objects.get(branch=main_branch)
-            except cls.DoesNotExist:
-                pass
-        
-        # Fall back to global info (no branch)
-        try:
-            return cls.objects.get(branch=None)
-        except cls.DoesNotExist:
-            return None
-    
+        version = cache.get_or_set(ADDITIONAL_INFO_CACHE_VERSION_KEY, time.time_ns(), None)
+        cache_key = f"addinfo:{version}:branch:{branch.pk if branch else 0}"
+        return cache.get_or_set(
+            cache_key,
+            lambda: cls._get_for_branch_uncached(branch),
+            ADDITIONAL_INFO_CACHE_TIMEOUT,
+        )
+
     @classmethod
-    def get_for_user(cls, user):
-        """Get AdditionalInfo based on user's selected branch"""
-        if user and user.branch:
-            return cls.get_for_branch(user.branch)
-        return cls.get_for_branch(None)
+    def invalidate_cache(cls):
+        """Drop every cached get_for_branch() result."""
+        cache.set(ADDITIONAL_INFO_CACHE_VERSION_KEY, time.time_ns(), None)
+
+    @classmethod
+    def _get_for_branch_uncached(cls, branch):
+        if not branch:
+            return cls.objects.filter(branch__isnull=True).first()
+
+        # Same main branch the center would pick (Branch ordering within a center)
+        main_branch_id = Subquery(
+            type(branch).objects.filter(center_id=branch.center_id, is_main=True)
+            .order_by('name')
+            .values('pk')[:1]
+        )
+        # Fetch every candidate in one query and pick the best match here
+        candidates = cls.objects.filter(
+            Q(branch_id=branch.pk) | Q(branch_id=main_branch_id) | Q(branch__isnull=True)
+        )
+
+        def priority(info):
+            if info.branch_id == branch.pk:
+                return 0
+            if info.branch_id is not None:
+                return 1
+            return 2
+
+        return min(candidates, key=priority, default=None)
     
     @classmethod
     def get_for_user(cls, user):
@@ -264,17 +305,17 @@ class BotUser(models.Model):
         center_name = self.center.name if self.center else "Global"
         return f"@{self.username or self.user_id} - {self.name} ({center_name})"
 
-    @property
+    @cached_property
     def display_name(self):
         """Get display name for user"""
         return self.name or f"User {self.user_id}"
     
-    @property
+    @cached_property
     def full_name(self):
         """Alias for name field for compatibility"""
         return self.name
 
-    @property
+    @cached_property
     def is_registered(self):
         """Check if user completed registration"""
         return self.is_active and bool(self.name) and bool(self.phone)
@@ -290,6 +331,11 @@ class BotUser(models.Model):
                 name='unique_user_per_center'
             )
         ]
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['branch', 'created_at']),
+            models.Index(fields=['agency', 'created_at']),
+        ]
 
     def save(self, *args, **kwargs):
         # Generate agency token and link if this is an agency user
@@ -305,10 +351,16 @@ class BotUser(models.Model):
         if not self.is_agency:
             return None
 
-        # Get bot username from the center's configuration
+        # Get bot username from the center's configuration (without loading
+        # the center just for this on every save)
         bot_username = None
-        if self.center and self.center.bot_username:
-            bot_username = self.center.bot_username.strip().lstrip("@")
+        if self.center_id:
+            if BotUser.center.is_cached(self):
+                center_bot_username = self.center.bot_username
+            else:
+                center_bot_username = _get_center_bot_username(self.center_id)
+            if center_bot_username:
+                bot_username = center_bot_username.strip().lstrip("@")
         
         # Fallback to environment variable for backward compatibility
         if not bot_username:
@@ -322,8 +374,8 @@ class BotUser(models.Model):
 
         # Generate link with center scope if available
         # Format: agency_{token}_{center_id} for center-scoped invites
-        if self.center:
-            return f"https://t.me/{bot_username}?start=agency_{self.agency_token}_{self.center.id}"
+        if self.center_id:
+            return f"https://t.me/{bot_username}?start=agency_{self.agency_token}_{self.center_id}"
         return f"https://t.me/{bot_username}?start=agency_{self.agency_token}"
 
     @classmethod
@@ -336,8 +388,6 @@ class BotUser(models.Model):
             token: The agency UUID token
             center_id: Optional center ID to scope the search (for multi-tenant)
         """
-        from django.db import transaction
-
         try:
             logger.debug(f"Looking for agency with token: {token}, center_id: {center_id}")
 
@@ -351,36 +401,21 @@ class BotUser(models.Model):
             if center_id:
                 filter_kwargs['center_id'] = center_id
 
-            # First, let's check if the agency exists at all (regardless of is_used)
-            all_agencies = cls.objects.filter(**filter_kwargs)
-            logger.debug(f"Found {all_agencies.count()} agency(ies) with this token")
-
-            if all_agencies.exists():
-                first_agency = all_agencies.first()
-                logger.debug(
-                    f"Agency found: {first_agency.name}, is_used={first_agency.is_used}, center={first_agency.center}"
-                )
-
-                if first_agency.is_used:
+            # Claim the token with a conditional UPDATE: only one caller can
+            # flip is_used, so no row lock is needed
+            claimed = cls.objects.filter(is_used=False, **filter_kwargs).update(
+                is_used=True, updated_at=timezone.now()
+            )
+            if not claimed:
+                if cls.objects.filter(**filter_kwargs).exists():
                     logger.warning("Agency token already used!")
-                    return None
-
-            with transaction.atomic():
-                # Add is_used filter for the actual fetch
-                filter_kwargs['is_used'] = False
-                
-                # Use select_for_update to lock the row
-                agency = cls.objects.select_for_update().get(**filter_kwargs)
-                logger.debug(
-                    f"Successfully retrieved unused agency: {agency.name} (ID: {agency.id})"
-                )
-
-                # Mark as used
-                agency.is_used = True
-                agency.save(update_fields=["is_used", "updated_at"])
-                logger.debug(f"Marked agency {agency.name} as used")
-
-                return agency
+                else:
+                    logger.warning(f"No unused agency found with token: {token}, center_id: {center_id}")
+                return None
+
+            agency = cls.objects.select_related('center').get(**filter_kwargs)
+            logger.debug(f"Marked agency {agency.name} (ID: {agency.id}) as used")
+            return agency
         except cls.DoesNotExist:
             logger.warning(f"No unused agency found with token: {token}, center_id: {center_id}")
             return None
@@ -393,17 +428,48 @@ class BotUser(models.Model):
             return None
 
 
+@receiver(post_save, sender=AdditionalInfo)
+@receiver(post_delete, sender=AdditionalInfo)
+@receiver(post_save, sender='organizations.Branch')
+@receiver(post_delete, sender='organizations.Branch')
+def invalidate_additional_info_cache(sender, instance, **kwargs):
+    """Info rows or main-branch flags changed - drop cached lookups"""
+    AdditionalInfo.invalidate_cache()
+
+
+@receiver(post_save, sender='organizations.TranslationCenter')
+@receiver(post_delete, sender='organizations.TranslationCenter')
+def invalidate_center_bot_username_cache(sender, instance, **kwargs):
+    """Bot username may have changed - drop the cached value"""
+    cache.delete(f"center_bot_username:{instance.pk}")
+
+
+@receiver(post_save, sender=BotUser)
+@receiver(post_delete, sender=BotUser)
+def invalidate_bot_user_counts(sender, instance, **kwargs):
+    """Bot users changed - drop cached list counts"""
+    cache.set(BOT_USERS_CACHE_VERSION_KEY, time.time_ns(), None)
+
+
 # ===== Signals for Admin Notifications =====
 
 @receiver(pre_save, sender=BotUser)
 def track_user_registration(sender, instance, **kwargs):
     """Track if this is a new user registration or agency status change"""
-    if instance.pk:
-        try:
-            old_instance = BotUser.objects.get(pk=instance.pk)
-            instance._was_active = old_instance.is_active
-            instance._was_agency = old_instance.is_agency
-        except BotUser.DoesNotExist:
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'is_active', 'is_agency'} & set(update_fields):
+        # Neither flag is being written, so neither can change - skip the lookup
+        instance._was_active = instance.is_active
+        instance._was_agency = instance.is_agency
+    elif instance.pk:
+        old_flags = (
+            BotUser.objects.filter(pk=instance.pk)
+            .values_list('is_active', 'is_agency')
+            .first()
+        )
+        if old_flags:
+            instance._was_active, instance._was_agency = old_flags
+        else:
             instance._was_active = False
             instance._was_agency = False
     else:
@@ -414,27 +480,33 @@ def track_user_registration(sender, instance, **kwargs):
 @receiver(post_save, sender=BotUser)
 def create_user_notification(sender, instance, created, **kwargs):
     """Create admin notification when a new user completes registration"""
-    try:
-        # Check if user just became active (completed registration)
-        was_active = getattr(instance, '_was_active', False)
-        was_agency = getattr(instance, '_was_agency', False)
-        
-        # New user completed registration
-        if instance.is_active and not was_active:
+    # Check if user just became active (completed registration)
+    was_active = getattr(instance, '_was_active', False)
+    was_agency = getattr(instance, '_was_agency', False)
+    
+    # New user completed registration
+    if instance.is_active and not was_active:
+        is_agency = instance.is_agency
+    # Existing user became agency
+    elif instance.is_agency and not was_agency and instance.is_active:
+        is_agency = True
+    else:
+        return
+
+    def notify():
+        try:
             from core.models import AdminNotification
-            
-            if instance.is_agency:
+
+            if is_agency:
                 AdminNotification.create_agency_notification(instance)
             else:
                 AdminNotification.create_user_notification(instance)
-        
-        # Existing user became agency
-        elif instance.is_agency and not was_agency and instance.is_active:
-            from core.models import AdminNotification
-            AdminNotification.create_agency_notification(instance)
-            
-    except Exception as e:
-        logger.error(f"Failed to create user notification: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"Failed to create user notification: {e}", exc_info=True)
+
+    # Write the notification once the user's save is committed, outside its
+    # transaction (and not at all if that transaction rolls back)
+    transaction.on_commit(notify)
 
 
 class BotUserState(models.Model):
@@ -515,34 +587,58 @@ class BotUserState(models.Model):
     def __str__(self):
         return f"State for {self.bot_user}"
     
+    # Field values of a cleared state (shared by clear_order_state and the
+    # bulk cleanup_old_states UPDATE)
+    CLEAR_DEFAULTS = {
+        'current_order': None,
+        'selected_category_id': None,
+        'selected_product_id': None,
+        'selected_language_id': None,
+        'copy_number': 0,
+        'uploaded_file_ids': [],
+        'total_pages': 0,
+        'message_ids': [],
+        'totals_message_id': None,
+        'last_instruction_message_id': None,
+        'pending_payment_order_id': None,
+        'pending_receipt_order_id': None,
+        'extra_data': {},
+    }
+
     def clear_order_state(self):
         """Clear all order-related state after order completion or cancellation"""
-        self.current_order = None
-        self.selected_category_id = None
-        self.selected_product_id = None
-        self.selected_language_id = None
-        self.copy_number = 0
-        self.uploaded_file_ids = []
-        self.total_pages = 0
-        self.message_ids = []
-        self.totals_message_id = None
-        self.last_instruction_message_id = None
-        self.pending_payment_order_id = None
-        self.pending_receipt_order_id = None
-        self.extra_data = {}
+        for field_name, value in self.CLEAR_DEFAULTS.items():
+            # Copy so instances never share (and mutate) the default list/dict
+            setattr(self, field_name, copy.copy(value))
         self.save()
     
+    def _append_to_list(self, field_name, value):
+        """Append value to a JSON list field unless it is already there"""
+        current = getattr(self, field_name) or []
+        if not value or value in current:
+            return
+        if connection.vendor == 'postgresql':
+            # Append server-side: constant-size write, and concurrent workers
+            # appending to the same state don't overwrite each other
+            column = connection.ops.quote_name(field_name)
+            type(self).objects.filter(pk=self.pk).exclude(
+                **{f'{field_name}__contains': [value]}
+            ).update(**{
+                field_name: RawSQL(f"{column} || %s::jsonb", [json.dumps([value])]),
+                'updated_at': timezone.now(),
+            })
+            setattr(self, field_name, current + [value])
+        else:
+            setattr(self, field_name, current + [value])
+            self.save(update_fields=[field_name, 'updated_at'])
+
     def add_message_id(self, message_id):
         """Add a message ID to the cleanup list"""
-        if message_id and message_id not in self.message_ids:
-            self.message_ids = self.message_ids + [message_id]
-            self.save(update_fields=['message_ids', 'updated_at'])
+        self._append_to_list('message_ids', message_id)
     
     def add_uploaded_file(self, file_id):
         """Add an uploaded file ID"""
-        if file_id and file_id not in self.uploaded_file_ids:
-            self.uploaded_file_ids = self.uploaded_file_ids + [file_id]
-            self.save(update_fields=['uploaded_file_ids', 'updated_at'])
+        self._append_to_list('uploaded_file_ids', file_id)
     
     def get_extra(self, key, default=None):
         """Get a value from extra_data"""
@@ -551,7 +647,30 @@ class BotUserState(models.Model):
     def set_extra(self, key, value):
         """Set a value in extra_data"""
         self.extra_data[key] = value
-        self.save(update_fields=['extra_data', 'updated_at'])
+        if connection.vendor == 'postgresql':
+            # Write only this key server-side (see _append_to_list)
+            type(self).objects.filter(pk=self.pk).update(
+                extra_data=RawSQL(
+                    "jsonb_set(extra_data, %s::text[], %s::jsonb)",
+                    [[str(key)], json.dumps(value)],
+                ),
+                updated_at=timezone.now(),
+            )
+        else:
+            self.save(update_fields=['extra_data', 'updated_at'])
+
+    def delete_extra(self, key):
+        """Remove a key from extra_data"""
+        if key not in self.extra_data:
+            return
+        del self.extra_data[key]
+        if connection.vendor == 'postgresql':
+            type(self).objects.filter(pk=self.pk).update(
+                extra_data=RawSQL("extra_data - %s", [str(key)]),
+                updated_at=timezone.now(),
+            )
+        else:
+            self.save(update_fields=['extra_data', 'updated_at'])
     
     @classmethod
     def get_or_create_for_user(cls, bot_user):
@@ -565,14 +684,11 @@ class BotUserState(models.Model):
         Clean up states that haven't been updated in the specified hours.
         Should be called periodically via management command or celery task.
         """
-        from django.utils import timezone
         from datetime import timedelta
         
         cutoff = timezone.now() - timedelta(hours=hours)
-        old_states = cls.objects.filter(updated_at__lt=cutoff)
         
         # Clear state but don't delete (preserve the record)
-        for state in old_states:
-            state.clear_order_state()
-        
-        return old_states.count()
+        return cls.objects.filter(updated_at__lt=cutoff).update(
+            **cls.CLEAR_DEFAULTS, updated_at=timezone.now()
+        )
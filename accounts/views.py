@@ -1,3 +1,8 @@
+import hashlib
+import logging
+import threading
+import time
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
@@ -13,6 +18,20 @@ from django.views.decorators.http import require_POST
 from django.http import JsonResponse
 from django.utils.translation import gettext_lazy as _
 
+logger = logging.getLogger(__name__)
+
+
+def _send_mail_in_background(subject, message, from_email, recipient_list):
+    """Send an email from a daemon thread so the request does not wait on SMTP"""
+
+    def _send():
+        try:
+            send_mail(subject, message, from_email, recipient_list, fail_silently=False)
+        except Exception:
+            logger.error("Failed to send email to %s", recipient_list, exc_info=True)
+
+    threading.Thread(target=_send, daemon=True).start()
+
 
 # ============ Admin Authentication Views ============
 
@@ -80,23 +99,19 @@ def forgot_password(request):
                 Admin Team
             """
 
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    (
-                        settings.DEFAULT_FROM_EMAIL
-                        if hasattr(settings, "DEFAULT_FROM_EMAIL")
-                        else "noreply@example.com"
-                    ),
-                    [email],
-                    fail_silently=False,
-                )
-                messages.success(
-                    request, "Password reset link has been sent to your email."
-                )
-            except Exception as e:
-                messages.error(request, "Failed to send email. Please try again later.")
+            _send_mail_in_background(
+                subject,
+                message,
+                (
+                    settings.DEFAULT_FROM_EMAIL
+                    if hasattr(settings, "DEFAULT_FROM_EMAIL")
+                    else "noreply@example.com"
+                ),
+                [email],
+            )
+            messages.success(
+                request, "Password reset link has been sent to your email."
+            )
 
         except User.DoesNotExist:
             # Don't reveal that user doesn't exist for security
@@ -127,7 +142,7 @@ def reset_password(request, uidb64, token):
                 messages.error(request, "Password must be at least 8 characters long.")
             else:
                 user.set_password(password)
-                user.save()
+                user.save(update_fields=["password"])
                 messages.success(
                     request, "Your password has been reset successfully. Please login."
                 )
@@ -143,11 +158,41 @@ def reset_password(request, uidb64, token):
 
 # ============ User Management Views ============
 
-from .models import BotUser
+from .models import BOT_USERS_CACHE_VERSION_KEY, BotUser
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
 from organizations.rbac import permission_required
 
+BOT_USERS_COUNT_CACHE_TIMEOUT = 60
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that takes its total from a lighter count queryset (without the
+    list's annotations) and caches it until bot users change.
+    """
+
+    def __init__(self, object_list, per_page, count_queryset, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_queryset = count_queryset
+
+    @cached_property
+    def count(self):
+        try:
+            sql, params = self.count_queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+        version = cache.get_or_set(BOT_USERS_CACHE_VERSION_KEY, time.time_ns(), None)
+        return cache.get_or_set(
+            f"botusers:count:{version}:{digest}",
+            self.count_queryset.count,
+            BOT_USERS_COUNT_CACHE_TIMEOUT,
+        )
+
 
 @login_required(login_url="admin_login")
 @permission_required('can_create_customers')
@@ -156,7 +201,7 @@ def addUser(request):
     from organizations.models import TranslationCenter, Branch
     
     # Get all agencies for the dropdown
-    agencies = BotUser.objects.filter(is_agency=True).order_by("name")
+    agencies = BotUser.objects.filter(is_agency=True).only("id", "name").order_by("name")
     
     # Get centers and branches based on user permissions
     if request.user.is_superuser:
@@ -217,32 +262,31 @@ def addUser(request):
                     is_agency=is_agency,
                 )
                 
-                # Set center if selected
+                # Set center if selected (only ids are needed for the FKs)
                 if center_id:
-                    try:
-                        center = TranslationCenter.objects.get(id=center_id)
-                        bot_user.center = center
-                    except TranslationCenter.DoesNotExist:
-                        pass
+                    bot_user.center_id = (
+                        TranslationCenter.objects.filter(id=center_id)
+                        .values_list("id", flat=True).first()
+                    )
                 
                 # Set branch if selected
                 if branch_id:
-                    try:
-                        branch = Branch.objects.get(id=branch_id)
-                        bot_user.branch = branch
+                    branch = (
+                        Branch.objects.filter(id=branch_id)
+                        .values_list("id", "center_id").first()
+                    )
+                    if branch:
+                        bot_user.branch_id, branch_center_id = branch
                         # Also set center from branch if not already set
-                        if not bot_user.center and branch.center:
-                            bot_user.center = branch.center
-                    except Branch.DoesNotExist:
-                        pass
+                        if not bot_user.center_id and branch_center_id:
+                            bot_user.center_id = branch_center_id
 
                 # Set agency if selected and not an agency itself
                 if agency_id and not is_agency:
-                    try:
-                        agency = BotUser.objects.get(id=agency_id, is_agency=True)
-                        bot_user.agency = agency
-                    except BotUser.DoesNotExist:
-                        pass
+                    bot_user.agency_id = (
+                        BotUser.objects.filter(id=agency_id, is_agency=True)
+                        .values_list("id", flat=True).first()
+                    )
 
                 bot_user.save()
                 messages.success(
@@ -275,11 +319,9 @@ def usersList(request):
     from django.db.models import Count, Max
 
     # Use RBAC-filtered customers with related branch/center data
-    # Add order statistics for each user
     users = (
         get_user_customers(request.user)
         .select_related("branch", "branch__center", "agency")
-        .annotate(order_count=Count("order"), last_order_date=Max("order__created_at"))
         .order_by("-created_at")
     )
 
@@ -318,7 +360,7 @@ def usersList(request):
     # Branch filter for owners
     from organizations.rbac import get_user_branches
 
-    branches = get_user_branches(request.user)
+    branches = get_user_branches(request.user).select_related("center")
     branch_filter = request.GET.get("branch", "")
     if branch_filter:
         users = users.filter(branch_id=branch_filter)
@@ -330,7 +372,13 @@ def usersList(request):
     except ValueError:
         per_page = 10
 
-    paginator = Paginator(users, per_page)
+    # Add order statistics for each user; the total is counted without them
+    # (they would join and group every order)
+    paginator = CachedCountPaginator(
+        users.annotate(order_count=Count("order"), last_order_date=Max("order__created_at")),
+        per_page,
+        count_queryset=users,
+    )
     page_number = request.GET.get("page", 1)
     page_obj = paginator.get_page(page_number)
 
@@ -363,7 +411,10 @@ def editUser(request, user_id):
 
     user = get_object_or_404(BotUser, id=user_id)
     agencies = (
-        BotUser.objects.filter(is_agency=True).exclude(id=user_id).order_by("name")
+        BotUser.objects.filter(is_agency=True)
+        .exclude(id=user_id)
+        .only("id", "name")
+        .order_by("name")
     )
     
     # Get centers and branches based on user permissions
@@ -438,40 +489,44 @@ def editUser(request, user_id):
                 user.is_active = is_active
                 user.is_agency = is_agency
                 
-                # Set center if selected
-                if center_id:
-                    try:
-                        center = TranslationCenter.objects.get(id=center_id)
-                        user.center = center
-                    except TranslationCenter.DoesNotExist:
-                        user.center = None
-                else:
-                    user.center = None
+                # Set center if selected (only ids are needed for the FKs)
+                user.center_id = (
+                    TranslationCenter.objects.filter(id=center_id)
+                    .values_list("id", flat=True).first()
+                    if center_id else None
+                )
                 
                 # Set branch if selected
-                if branch_id:
-                    try:
-                        branch = Branch.objects.get(id=branch_id)
-                        user.branch = branch
-                        # Also set center from branch if not already set
-                        if not user.center and branch.center:
-                            user.center = branch.center
-                    except Branch.DoesNotExist:
-                        user.branch = None
+                branch = (
+                    Branch.objects.filter(id=branch_id)
+                    .values_list("id", "center_id").first()
+                    if branch_id else None
+                )
+                if branch:
+                    user.branch_id, branch_center_id = branch
+                    # Also set center from branch if not already set
+                    if not user.center_id and branch_center_id:
+                        user.center_id = branch_center_id
                 else:
-                    user.branch = None
+                    user.branch_id = None
 
                 # Set agency if selected and not an agency itself
-                if agency_id and not is_agency:
-                    try:
-                        agency = BotUser.objects.get(id=agency_id, is_agency=True)
-                        user.agency = agency
-                    except BotUser.DoesNotExist:
-                        user.agency = None
-                else:
-                    user.agency = None
+                user.agency_id = (
+                    BotUser.objects.filter(id=agency_id, is_agency=True)
+                    .values_list("id", flat=True).first()
+                    if agency_id and not is_agency else None
+                )
 
-                user.save()
+                # Write only the edited fields (plus the agency token/link that
+                # save() maintains) so bot-side fields like step/is_used that
+                # changed meanwhile are not overwritten
+                user.save(
+                    update_fields=[
+                        "name", "phone", "username", "user_id", "language",
+                        "is_active", "is_agency", "center", "branch", "agency",
+                        "agency_token", "agency_link", "updated_at",
+                    ]
+                )
                 messages.success(
                     request, f'User "{name}" has been updated successfully.'
                 )
@@ -538,34 +593,50 @@ def userDetail(request):
         messages.error(request, "User ID is required.")
         return redirect("usersList")
 
-    user = get_object_or_404(BotUser, id=user_id)
+    user = get_object_or_404(
+        BotUser.objects.select_related("center", "branch", "agency"), id=user_id
+    )
 
     # Get user's orders
-    orders = Order.objects.filter(bot_user=user).order_by("-created_at")[:10]
-    total_orders = Order.objects.filter(bot_user=user).count()
-    completed_orders = Order.objects.filter(bot_user=user, status="completed").count()
-    pending_orders = Order.objects.filter(
-        bot_user=user,
-        status__in=["pending", "payment_pending", "payment_received", "in_progress"],
-    ).count()
+    user_orders = Order.objects.filter(bot_user=user)
+    orders = user_orders.select_related("branch__center", "product").order_by(
+        "-created_at"
+    )[:10]
+    order_stats = user_orders.aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+        pending=Count(
+            "id",
+            filter=Q(
+                status__in=["pending", "payment_pending", "payment_received", "in_progress"]
+            ),
+        ),
+    )
 
     # Get agency users if this user is an agency
     agency_users = []
+    agency_users_count = 0
     if user.is_agency:
-        agency_users = BotUser.objects.filter(agency=user).order_by("-created_at")[:5]
+        agency_users = list(
+            BotUser.objects.filter(agency=user).order_by("-created_at")[:5]
+        )
+        # A short first page already is the full count
+        agency_users_count = (
+            len(agency_users)
+            if len(agency_users) < 5
+            else BotUser.objects.filter(agency=user).count()
+        )
 
     context = {
         "title": "User Details",
         "subTitle": "User Details",
         "bot_user": user,
         "orders": orders,
-        "total_orders": total_orders,
-        "completed_orders": completed_orders,
-        "pending_orders": pending_orders,
+        "total_orders": order_stats["total"],
+        "completed_orders": order_stats["completed"],
+        "pending_orders": order_stats["pending"],
         "agency_users": agency_users,
-        "agency_users_count": (
-            BotUser.objects.filter(agency=user).count() if user.is_agency else 0
-        ),
+        "agency_users_count": agency_users_count,
     }
     return render(request, "users/userDetail.html", context)
 
@@ -608,7 +679,7 @@ def updateProfile(request):
             user.first_name = first_name
             user.last_name = last_name
             user.email = email
-            user.save()
+            user.save(update_fields=["first_name", "last_name", "email"])
 
             # Update admin_profile fields (avatar and phone)
             # Create AdminUser if it doesn't exist (for superusers, role can be null)
@@ -666,7 +737,7 @@ def changePassword(request):
 
         try:
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=["password"])
             # Keep the user logged in after password change
             update_session_auth_hash(request, user)
             messages.success(request, "Password changed successfully.")
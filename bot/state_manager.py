@@ -112,15 +112,13 @@ class StateManager:
     
     def set(self, key, value):
         """Set a value in extra_data"""
-        self.state.extra_data[key] = value
-        self.state.save(update_fields=['extra_data', 'updated_at'])
+        self.state.set_extra(key, value)
         self._invalidate_cache()
     
     def delete(self, key):
         """Delete a key from extra_data"""
         if key in self.state.extra_data:
-            del self.state.extra_data[key]
-            self.state.save(update_fields=['extra_data', 'updated_at'])
+            self.state.delete_extra(key)
             self._invalidate_cache()
     
     # ==========================================================================
@@ -187,12 +185,9 @@ class StateManager:
     
     def add_file(self, file_id):
         """Add a file ID to the upload list"""
-        if file_id:
-            files = self.state.uploaded_file_ids or []
-            if file_id not in files:
-                self.state.uploaded_file_ids = files + [file_id]
-                self.state.save(update_fields=['uploaded_file_ids', 'updated_at'])
-                self._invalidate_cache()
+        if file_id and file_id not in (self.state.uploaded_file_ids or []):
+            self.state.add_uploaded_file(file_id)
+            self._invalidate_cache()
     
     def clear_files(self):
         """Clear all uploaded files"""
@@ -220,12 +215,9 @@ class StateManager:
     
     def add_message_id(self, message_id):
         """Add a message ID for later cleanup"""
-        if message_id:
-            ids = self.state.message_ids or []
-            if message_id not in ids:
-                self.state.message_ids = ids + [message_id]
-                self.state.save(update_fields=['message_ids', 'updated_at'])
-                self._invalidate_cache()
+        if message_id and message_id not in (self.state.message_ids or []):
+            self.state.add_message_id(message_id)
+            self._invalidate_cache()
     
     def clear_message_ids(self):
         """Clear message ID list after cleanup"""
@@ -378,8 +378,8 @@ class AdminNotification(models.Model):
             object_id=user.id,
             title=f"👤 New User",
             message=f"{user.name} registered ({user.phone})",
-            branch=user.branch,
-            center=user.center,
+            branch_id=user.branch_id,
+            center_id=user.center_id,
         )
     
     @classmethod
@@ -393,8 +393,8 @@ class AdminNotification(models.Model):
             object_id=agency.id,
             title=f"🏢 New Agency",
             message=f"{agency.name} registered as agency ({agency.phone})",
-            branch=agency.branch,
-            center=agency.center,
+            branch_id=agency.branch_id,
+            center_id=agency.center_id,
         )
     
     @classmethod
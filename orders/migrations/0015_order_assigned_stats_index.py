@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_add_bot_user_state'),
+        ('core', '0007_auto_20260123_1501'),
+        ('orders', '0014_short_filenames'),
+        ('organizations', '0022_role_can_delete_languages'),
+        ('services', '0010_populate_language_translations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['assigned_to', 'created_at', 'status', 'total_pages'], name='orders_orde_assigne_ab8dca_idx'),
+        ),
+    ]
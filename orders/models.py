@@ -1,6 +1,6 @@
 import logging
 from django.db import models
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
@@ -709,6 +709,10 @@ class Order(models.Model):
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
         ordering = ["-created_at"]
+        indexes = [
+            # Covers the per-staff statistics aggregates (index-only scans)
+            models.Index(fields=['assigned_to', 'created_at', 'status', 'total_pages']),
+        ]
 
 
 class Receipt(models.Model):
@@ -970,6 +974,15 @@ def send_status_notification(sender, instance, created, **kwargs):
                 logger.error(f" Failed to create payment notification: {e}")
 
 
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_reports(sender, instance, **kwargs):
+    """Orders feed every report - drop cached reports"""
+    from services.analytics import invalidate_reports_cache
+
+    invalidate_reports_cache()
+
+
 @receiver(post_save, sender=Receipt)
 def create_receipt_notification(sender, instance, created, **kwargs):
     """Create an admin notification when a new receipt is uploaded"""
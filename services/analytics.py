@@ -4,12 +4,29 @@ Provides remaining balance/debt calculations per branch, client type, and center
 Supports multi-tenant data separation through RBAC.
 """
 
+import time
 from decimal import Decimal
+from django.core.cache import cache
 from django.db.models import Sum, Count, Case, When, F, Q, DecimalField
 from django.db.models.functions import Coalesce
 from organizations.rbac import get_user_orders
 
 
+# Cached report contexts are keyed on this version; bumping it invalidates
+# all of them at once
+REPORTS_CACHE_VERSION_KEY = "reports:version"
+
+
+def get_reports_cache_version():
+    """Return the current reports cache version."""
+    return cache.get_or_set(REPORTS_CACHE_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_reports_cache():
+    """Invalidate every cached report (call when orders or expenses change)."""
+    cache.set(REPORTS_CACHE_VERSION_KEY, time.time_ns(), None)
+
+
 def get_remaining_balance_summary(user, date_from=None, date_to=None):
     """
     Get overall remaining balance summary for the user's scope.
@@ -42,29 +59,25 @@ def get_remaining_balance_summary(user, date_from=None, date_to=None):
         )
     )
     
-    # Filter orders with outstanding balance
-    unpaid_orders = orders_with_remaining.filter(calc_remaining__gt=0)
-    
-    # Aggregate totals
-    total_remaining = unpaid_orders.aggregate(
-        total=Coalesce(Sum('calc_remaining'), Decimal('0'))
-    )['total']
-    
-    total_orders_with_debt = unpaid_orders.count()
-    fully_paid_count = orders_with_remaining.filter(calc_remaining__lte=0).count()
-    
-    # Total received amount
-    total_received = active_orders.aggregate(
-        total=Coalesce(Sum('received'), Decimal('0'))
-    )['total']
-    
-    # Total expected revenue (total_price + extra_fee)
-    total_expected = active_orders.aggregate(
-        total=Coalesce(
+    # Outstanding, paid and expected totals in one query
+    totals = orders_with_remaining.aggregate(
+        total_remaining=Coalesce(
+            Sum('calc_remaining', filter=Q(calc_remaining__gt=0)), Decimal('0')
+        ),
+        total_orders_with_debt=Count('id', filter=Q(calc_remaining__gt=0)),
+        fully_paid_count=Count('id', filter=Q(calc_remaining__lte=0)),
+        total_received=Coalesce(Sum('received'), Decimal('0')),
+        # Total expected revenue (total_price + extra_fee)
+        total_expected=Coalesce(
             Sum(F('total_price') + F('extra_fee')),
             Decimal('0')
-        )
-    )['total']
+        ),
+    )
+    total_remaining = totals['total_remaining']
+    total_orders_with_debt = totals['total_orders_with_debt']
+    fully_paid_count = totals['fully_paid_count']
+    total_received = totals['total_received']
+    total_expected = totals['total_expected']
     
     # Collection rate
     collection_rate = 0
@@ -321,19 +334,29 @@ def get_top_debtors(user, limit=10, date_from=None, date_to=None):
     if limit is not None:
         customer_data = customer_data[:limit]
     
+    customer_data = list(customer_data)
+    
+    # Branch and center of each customer's latest order, fetched in one query
+    latest_branches = {}
+    for bot_user_id, branch_id, branch_name, center_id, center_name in orders.filter(
+        bot_user__id__in=[item['bot_user__id'] for item in customer_data]
+    ).order_by('-created_at').values_list(
+        'bot_user_id', 'branch_id', 'branch__name', 'branch__center_id', 'branch__center__name'
+    ):
+        latest_branches.setdefault(bot_user_id, (branch_id, branch_name, center_id, center_name))
+    
     result = []
     for item in customer_data:
         collection_rate = 0
         if item['total_expected'] and item['total_expected'] > 0:
             collection_rate = round((float(item['total_received']) / float(item['total_expected'])) * 100, 1)
         
-        # Get center and branch from the customer's orders
-        customer_orders = orders.filter(bot_user__id=item['bot_user__id'])
-        first_order = customer_orders.first()
-        center_name = first_order.branch.center.name if first_order and first_order.branch else 'N/A'
-        branch_name = first_order.branch.name if first_order and first_order.branch else 'N/A'
-        center_id = first_order.branch.center.id if first_order and first_order.branch else None
-        branch_id = first_order.branch.id if first_order and first_order.branch else None
+        branch_id, branch_name, center_id, center_name = latest_branches.get(
+            item['bot_user__id'], (None, None, None, None)
+        )
+        if branch_id is None:
+            branch_name = center_name = 'N/A'
+            center_id = None
         
         result.append({
             'customer_id': item['bot_user__id'],
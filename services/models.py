@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Sum
 from decimal import Decimal
@@ -593,3 +595,13 @@ class Product(models.Model):
         verbose_name = str(_("Document Type"))
         verbose_name_plural = str(_("Document Types"))
         unique_together = ("category", "name")
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(m2m_changed, sender=Product.expenses.through)
+def invalidate_expense_reports(sender, **kwargs):
+    """Expense prices or product links changed - drop cached reports"""
+    from services.analytics import invalidate_reports_cache
+
+    invalidate_reports_cache()
@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.contrib.auth.models import User
 from decimal import Decimal
 from .models import Expense, Product, Category, Language
+from .analytics import get_reports_cache_version
 from organizations.models import TranslationCenter, Branch, Role, AdminUser
 
 
@@ -512,3 +513,66 @@ class ExpenseAdminTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         # Check for expenses field in the form
         self.assertContains(response, 'expenses')
+
+
+class ExpenseReportsCacheTestCase(TestCase):
+    """Test that expense changes invalidate cached reports"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.owner = User.objects.create_user(
+            username='test_owner',
+            password='testpass123'
+        )
+        self.center = TranslationCenter.objects.create(
+            name='Test Center',
+            owner=self.owner,
+            is_active=True
+        )
+        self.branch = Branch.objects.create(
+            center=self.center,
+            name='Test Branch',
+            is_active=True,
+            is_main=True
+        )
+        self.category = Category.objects.create(
+            branch=self.branch,
+            name='Translation',
+            charging='dynamic',
+            is_active=True
+        )
+        self.product = Product.objects.create(
+            name='Test Document',
+            category=self.category,
+            ordinary_first_page_price=Decimal('50000.00'),
+            ordinary_other_page_price=Decimal('30000.00'),
+            agency_first_page_price=Decimal('40000.00'),
+            agency_other_page_price=Decimal('25000.00'),
+            is_active=True
+        )
+        self.expense = Expense.objects.create(
+            name='Paper Cost',
+            price_for_original=Decimal('5000.00'),
+            price_for_copy=Decimal('1000.00'),
+            expense_type='both',
+            branch=self.branch
+        )
+    
+    def test_expense_save_bumps_cache_version(self):
+        """Saving an expense invalidates cached reports"""
+        version = get_reports_cache_version()
+        self.expense.price_for_original = Decimal('6000.00')
+        self.expense.save()
+        self.assertNotEqual(get_reports_cache_version(), version)
+    
+    def test_expense_delete_bumps_cache_version(self):
+        """Deleting an expense invalidates cached reports"""
+        version = get_reports_cache_version()
+        self.expense.delete()
+        self.assertNotEqual(get_reports_cache_version(), version)
+    
+    def test_product_expense_link_bumps_cache_version(self):
+        """Linking an expense to a product invalidates cached reports"""
+        version = get_reports_cache_version()
+        self.product.expenses.add(self.expense)
+        self.assertNotEqual(get_reports_cache_version(), version)